@@ -0,0 +1,95 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class ThresholdSweep(NamedTuple):
+    """
+    Quality of predictions for every threshold of the grid. Prediction is accepted when its confidence
+    is greater than threshold, otherwise algorithm is reported as unknown
+    """
+    thresholds: np.ndarray
+    coverage: np.ndarray  # Share of accepted predictions
+    accuracy: np.ndarray  # Share of correct predictions among accepted, NaN if none is accepted
+    unknown_rate: np.ndarray  # Share of predictions reported as unknown
+    error_rate: np.ndarray  # Share of accepted wrong predictions among all predictions
+
+
+class Reliability(NamedTuple):
+    """
+    Reliability diagram: predictions grouped into equally wide confidence bins
+    """
+    counts: np.ndarray
+    confidence: np.ndarray  # Mean confidence in bin, NaN for empty bins
+    accuracy: np.ndarray  # Share of correct predictions in bin, NaN for empty bins
+    ece: float  # Expected calibration error
+
+
+def sweep_thresholds(probabilities, targets, thresholds):
+    """
+    @param probabilities: matrix of class probabilities, one row per sample
+    @param targets: column indices of true classes
+    @param thresholds: increasing array of thresholds
+    @return: ThresholdSweep
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    confidences = probabilities.max(axis=1)
+    correct = probabilities.argmax(axis=1) == targets
+
+    order = np.argsort(confidences, kind='stable')
+    # Samples with confidence not greater than threshold are rejected
+    rejected = np.searchsorted(confidences[order], thresholds, side='right')
+    correct_rejected = np.concatenate([[0], np.cumsum(correct[order])])[rejected]
+    accepted = len(confidences) - rejected
+    correct_accepted = np.count_nonzero(correct) - correct_rejected
+
+    total = max(len(confidences), 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        accuracy = np.where(accepted > 0, correct_accepted / accepted, np.nan)
+    return ThresholdSweep(thresholds, accepted / total, accuracy, rejected / total,
+                          (accepted - correct_accepted) / total)
+
+
+def reliability(confidences, correct, bins=10):
+    """
+    @param confidences: predicted probabilities of events
+    @param correct: whether events happened
+    @param bins: number of confidence bins
+    @return: Reliability
+    """
+    confidences = np.asarray(confidences, dtype=np.float64)
+    correct = np.asarray(correct, dtype=np.float64)
+    # Confidence 1.0 belongs to the last bin
+    indices = np.minimum((confidences * bins).astype(np.int64), bins - 1)
+    counts = np.bincount(indices, minlength=bins)
+    confidence_sums = np.bincount(indices, weights=confidences, minlength=bins)
+    correct_sums = np.bincount(indices, weights=correct, minlength=bins)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_confidence = confidence_sums / counts
+        accuracy = correct_sums / counts
+    ece = float(np.abs(correct_sums - confidence_sums).sum() / max(len(confidences), 1))
+    return Reliability(counts, mean_confidence, accuracy, ece)
+
+
+def class_reliability(probabilities, targets, bins=10):
+    """
+    One-vs-rest calibration of every class: probability of class against whether sample belongs to it
+    @param probabilities: matrix of class probabilities, one row per sample
+    @param targets: column indices of true classes
+    @param bins: number of confidence bins
+    @return: List of Reliability in order of probability columns
+    """
+    belongs = targets[:, np.newaxis] == np.arange(probabilities.shape[1])
+    return [reliability(probabilities[:, i], belongs[:, i], bins) for i in range(probabilities.shape[1])]
+
+
+def recommend_threshold(sweep, target_accuracy):
+    """
+    @param sweep: ThresholdSweep
+    @param target_accuracy: required share of correct predictions among accepted
+    @return: Index of the lowest threshold reaching target accuracy, so the most predictions are accepted,
+    or None if no threshold reaches it
+    """
+    reached = np.flatnonzero(np.nan_to_num(sweep.accuracy, nan=0.0) >= target_accuracy)
+    return int(reached[0]) if len(reached) else None
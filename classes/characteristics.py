@@ -0,0 +1,77 @@
+import ast
+import functools
+import types
+from pathlib import Path
+
+from classes.exceptions import ErrorInSorting, NoSortMethod
+from classes.performance_analysis import PerformanceAnalyser
+from classes.syntax_analysis import SyntaxAnalyser
+
+
+def load_sort_function(path_to_algorithm: Path, tree):
+    """
+    Executes source code of sorting algorithm as a separate module
+    @param path_to_algorithm: path to source code of sorting algorithm
+    @param tree: parsed source code
+    @return: Function called sort
+    """
+    module = types.ModuleType(path_to_algorithm.stem)
+    module.__file__ = str(path_to_algorithm)
+    try:
+        exec(compile(tree, str(path_to_algorithm), 'exec'), module.__dict__)
+    except Exception as e:
+        raise ErrorInSorting(e)
+
+    sort = getattr(module, 'sort', None)
+    if not callable(sort):
+        raise NoSortMethod(path_to_algorithm)
+    return sort
+
+
+def parse_source(path_to_algorithm: Path):
+    """
+    @param path_to_algorithm: path to source code of sorting algorithm
+    @return: AST of source code
+    """
+    code = Path(path_to_algorithm).read_text()
+    try:
+        return ast.parse(code, str(path_to_algorithm))
+    except SyntaxError as e:
+        raise ErrorInSorting(e)
+
+
+def get_algorithm_characteristics(path_to_algorithm: Path, groups=()):
+    """
+    Extracts performance and syntax characteristics of given sorting algorithm
+    @param path_to_algorithm: path to source code of sorting algorithm
+    @param groups: names of optional feature groups (see classes.features.FEATURE_GROUPS)
+    @return: Dictionary containing algorithm characteristics
+    """
+    # Source code is read and parsed once for both execution and syntax analysis
+    tree = parse_source(path_to_algorithm)
+
+    performance_characteristics = PerformanceAnalyser.measure_algorithm(load_sort_function(path_to_algorithm, tree),
+                                                                       groups)
+    syntax_characteristics = SyntaxAnalyser.analyze(tree)
+
+    return {**performance_characteristics, **syntax_characteristics}
+
+
+def get_profile_report(path_to_algorithm: Path):
+    """
+    Profiles running time, memory and function calls of given sorting algorithm
+    @param path_to_algorithm: path to source code of sorting algorithm
+    @return: Dictionary returned by PerformanceAnalyser.profile_report
+    """
+    path_to_algorithm = Path(path_to_algorithm)
+    return PerformanceAnalyser.profile_report(load_sort_function(path_to_algorithm, parse_source(path_to_algorithm)))
+
+
+def make_extractor(groups=()):
+    """
+    @param groups: names of optional feature groups
+    @return: Function extracting default and requested characteristics from path to source code
+    """
+    if not groups:
+        return get_algorithm_characteristics
+    return functools.partial(get_algorithm_characteristics, groups=tuple(groups))
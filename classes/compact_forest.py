@@ -0,0 +1,151 @@
+import base64
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+NODE_DTYPE = np.dtype([('left', '<i4'), ('right', '<i4'), ('feature', '<i4'), ('threshold', '<f8')])
+
+
+class CompactForest:
+    """
+    Random forest stored as flat node arrays.
+    Nodes of all trees are concatenated; children indices are global, leaves have left = right = -1
+    """
+    def __init__(self, nodes, values, roots, classes, feature_names):
+        """
+        @param nodes: array of NODE_DTYPE
+        @param values: array (n_nodes, n_classes) of class probabilities in every node
+        @param roots: array of root node indices, one per tree
+        @param classes: class labels in order of values columns
+        @param feature_names: names of features in order expected by trees
+        """
+        self.nodes = nodes
+        self.values = values
+        self.roots = roots
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names)
+
+    @classmethod
+    def from_estimator(cls, clf, label_encoder=None):
+        """
+        @param clf: fitted sklearn RandomForestClassifier
+        @param label_encoder: LabelEncoder used for targets. Forest classes are kept if not provided
+        @return: CompactForest
+        """
+        trees = [estimator.tree_ for estimator in clf.estimators_]
+        nodes = np.empty(sum(tree.node_count for tree in trees), dtype=NODE_DTYPE)
+        values = np.empty((len(nodes), len(clf.classes_)), dtype=np.float64)
+        roots = np.empty(len(trees), dtype=np.int32)
+
+        offset = 0
+        for i, tree in enumerate(trees):
+            tree_nodes = nodes[offset:offset + tree.node_count]
+            is_leaf = tree.children_left == -1
+            tree_nodes['left'] = np.where(is_leaf, -1, tree.children_left + offset)
+            tree_nodes['right'] = np.where(is_leaf, -1, tree.children_right + offset)
+            tree_nodes['feature'] = np.where(is_leaf, 0, tree.feature)
+            tree_nodes['threshold'] = tree.threshold
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :]
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values[offset:offset + tree.node_count] = proba / normalizer
+
+            roots[i] = offset
+            offset += tree.node_count
+
+        classes = clf.classes_ if label_encoder is None else label_encoder.inverse_transform(clf.classes_)
+        return cls(nodes, values, roots, classes, clf.feature_names_in_)
+
+    def _to_matrix(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names]
+        # Trees compare features in single precision, same as sklearn
+        return np.asarray(X, dtype=np.float32)
+
+    def predict_proba(self, X):
+        """
+        Walks all trees for all samples simultaneously, one tree level per step.
+        Result is identical to RandomForestClassifier.predict_proba
+        @param X: dataframe with feature_names columns or array (n_samples, n_features)
+        @return: Array (n_samples, n_classes) of class probabilities
+        """
+        X = self._to_matrix(X)
+        rows = np.arange(len(X))[:, np.newaxis]
+        left, right, feature, threshold = (self.nodes[field] for field in ('left', 'right', 'feature', 'threshold'))
+
+        # Current node of every (sample, tree) pair
+        node = np.repeat(self.roots[np.newaxis, :], len(X), axis=0)
+        while True:
+            left_child = left[node]
+            is_inner = left_child != -1
+            if not is_inner.any():
+                break
+            goes_left = X[rows, feature[node]] <= threshold[node]
+            node = np.where(is_inner, np.where(goes_left, left_child, right[node]), node)
+
+        # Trees are summed one by one in the same order as sklearn to get bitwise equal result
+        proba = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        for tree_leaves in node.T:
+            proba += self.values[tree_leaves]
+        proba /= len(self.roots)
+        return proba
+
+    def _meta(self):
+        return {'format_version': FORMAT_VERSION, 'roots': self.roots.tolist(),
+                'classes': self.classes_.tolist(), 'feature_names': self.feature_names}
+
+    @classmethod
+    def _from_meta(cls, meta, nodes, values):
+        if meta['format_version'] != FORMAT_VERSION:
+            raise ValueError(f'Unsupported forest format version {meta["format_version"]}')
+        return cls(nodes, values, np.asarray(meta['roots'], dtype=np.int32), meta['classes'], meta['feature_names'])
+
+    def save(self, directory):
+        """
+        Saves forest as directory of .npy arrays and JSON metadata
+        @param directory: output directory. Created if missing
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / 'nodes.npy', self.nodes)
+        np.save(directory / 'values.npy', self.values)
+        with open(directory / 'meta.json', 'w') as meta_file:
+            json.dump(self._meta(), meta_file)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        @param directory: directory created by save
+        @param mmap: memory-map node arrays instead of reading them
+        @return: CompactForest
+        """
+        directory = Path(directory)
+        mmap_mode = 'r' if mmap else None
+        with open(directory / 'meta.json') as meta_file:
+            meta = json.load(meta_file)
+        return cls._from_meta(meta, np.load(directory / 'nodes.npy', mmap_mode=mmap_mode),
+                              np.load(directory / 'values.npy', mmap_mode=mmap_mode))
+
+    def dumps(self):
+        """
+        @return: Forest packed into compressed npz and encoded with base64. Suitable for embedding in source code
+        """
+        buffer = io.BytesIO()
+        meta = np.frombuffer(json.dumps(self._meta()).encode(), dtype=np.uint8)
+        np.savez_compressed(buffer, nodes=self.nodes, values=self.values, meta=meta)
+        return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    @classmethod
+    def loads(cls, string):
+        """
+        @param string: string created by dumps
+        @return: CompactForest
+        """
+        with np.load(io.BytesIO(base64.b64decode(string))) as arrays:
+            meta = json.loads(arrays['meta'].tobytes())
+            return cls._from_meta(meta, arrays['nodes'], arrays['values'])
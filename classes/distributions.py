@@ -0,0 +1,98 @@
+import functools
+
+import numpy as np
+
+# Registered generators by distribution name. Generator takes numpy Generator, size and optional parameters
+# and returns array of sorting criteria
+DISTRIBUTIONS = {}
+
+
+def register_distribution(name):
+    """
+    Adds generator of test data to the library. Can be used as function decorator
+    @param name: name of distribution
+    @return: Decorator returning generator unchanged
+    """
+    def decorator(generator):
+        DISTRIBUTIONS[name] = generator
+        return generator
+    return decorator
+
+
+@functools.lru_cache(maxsize=256)
+def _generate(name, size, seed, params):
+    values = DISTRIBUTIONS[name](np.random.default_rng(seed), size, **dict(params))
+    values = np.ascontiguousarray(values, dtype=np.int64)
+    # Arrays are shared between callers
+    values.setflags(write=False)
+    return values
+
+
+def generate(name, size, seed=0, **params):
+    """
+    Generates test data. Result is cached, so the same data isn't rebuilt for every sorting algorithm
+    @param name: name of registered distribution
+    @param size: number of elements
+    @param seed: seed of random generator
+    @param params: parameters of distribution
+    @return: Read-only int64 array of sorting criteria
+    """
+    return _generate(name, size, seed, tuple(sorted(params.items())))
+
+
+@register_distribution('sorted')
+def sorted_values(rng, size):
+    return np.arange(size)
+
+
+@register_distribution('reversed')
+def reversed_values(rng, size):
+    return np.arange(size)[::-1]
+
+
+@register_distribution('shuffled')
+def shuffled_values(rng, size):
+    return rng.permutation(size)
+
+
+@register_distribution('nearly sorted')
+def nearly_sorted_values(rng, size, k=None):
+    """
+    Every element is at most k positions away from its place in sorted order
+    @param k: maximal displacement. Tenth of size if not provided
+    """
+    if k is None:
+        k = max(1, size // 10)
+    # Sorting positions shifted by less than k + 1 can't move any element further than k
+    keys = np.arange(size) + rng.uniform(0, k + 1, size)
+    return np.argsort(keys, kind='stable')
+
+
+@register_distribution('few unique')
+def few_unique_values(rng, size, unique=5):
+    return rng.integers(0, unique, size)
+
+
+@register_distribution('many duplicates')
+def many_duplicates_values(rng, size, copies=4):
+    """
+    @param copies: average number of copies of every value
+    """
+    return rng.integers(0, max(1, size // copies), size)
+
+
+@register_distribution('organ pipe')
+def organ_pipe_values(rng, size):
+    """
+    Ascending first half followed by descending second half
+    """
+    positions = np.arange(size)
+    return np.minimum(positions, size - 1 - positions)
+
+
+@register_distribution('sawtooth')
+def sawtooth_values(rng, size, teeth=4):
+    """
+    @param teeth: number of ascending runs
+    """
+    return np.arange(size) % max(1, -(-size // teeth))
@@ -1,39 +1,103 @@
-class Element:
+import math
+
+from classes.exceptions import ComparisonBudgetExceeded
+
+OPERATORS = ('lt', 'gt', 'le', 'ge', 'eq', 'ne')
+
+
+class ComparisonCounter:
     """
-    Class that keeps count of how many times instances were compared
+    Measurement context. Counts comparisons of Elements bound to it separately for every operator.
+    Comparison beyond the budget raises ComparisonBudgetExceeded
     """
-    comparison_counter = 0
+    __slots__ = OPERATORS + ('budget', 'remaining')
+
+    def __init__(self, budget=None):
+        """
+        :param budget: maximal number of comparisons. Unlimited if not provided
+        """
+        self.lt = 0
+        self.gt = 0
+        self.le = 0
+        self.ge = 0
+        self.eq = 0
+        self.ne = 0
+        self.budget = budget
+        self.remaining = budget if budget is not None else math.inf
+
+    @property
+    def exceeded(self):
+        return self.remaining < 0
 
-    @classmethod
-    def reset_counter(cls):
-        cls.comparison_counter = 0
+    @property
+    def total(self):
+        return self.lt + self.gt + self.le + self.ge + self.eq + self.ne
+
+    def as_dict(self):
+        """
+        :return: Dictionary of comparison counts by operator name
+        """
+        return {operator: getattr(self, operator) for operator in OPERATORS}
+
+
+class Element:
+    """
+    Class that keeps count of how many times instances were compared.
+    Comparisons are counted by the ComparisonCounter element was created with
+    """
+    __slots__ = ('sorting_criteria', 'sequential_id', 'counter')
 
-    def __init__(self, sorting_criteria, sequential_id):
+    def __init__(self, sorting_criteria, sequential_id, counter=None):
         self.sorting_criteria = sorting_criteria
         self.sequential_id = sequential_id
+        self.counter = counter if counter is not None else ComparisonCounter()
 
     def __lt__(self, other):
-        Element.comparison_counter += 1
+        counter = self.counter
+        counter.lt += 1
+        counter.remaining -= 1
+        if counter.remaining < 0:
+            raise ComparisonBudgetExceeded(counter.budget)
         return self.sorting_criteria < other.sorting_criteria
 
     def __gt__(self, other):
-        Element.comparison_counter += 1
+        counter = self.counter
+        counter.gt += 1
+        counter.remaining -= 1
+        if counter.remaining < 0:
+            raise ComparisonBudgetExceeded(counter.budget)
         return self.sorting_criteria > other.sorting_criteria
 
     def __le__(self, other):
-        Element.comparison_counter += 1
+        counter = self.counter
+        counter.le += 1
+        counter.remaining -= 1
+        if counter.remaining < 0:
+            raise ComparisonBudgetExceeded(counter.budget)
         return self.sorting_criteria <= other.sorting_criteria
 
     def __ge__(self, other):
-        Element.comparison_counter += 1
+        counter = self.counter
+        counter.ge += 1
+        counter.remaining -= 1
+        if counter.remaining < 0:
+            raise ComparisonBudgetExceeded(counter.budget)
         return self.sorting_criteria >= other.sorting_criteria
 
     def __eq__(self, other):
-        Element.comparison_counter += 1
+        counter = self.counter
+        counter.eq += 1
+        counter.remaining -= 1
+        if counter.remaining < 0:
+            raise ComparisonBudgetExceeded(counter.budget)
         return self.sorting_criteria == other.sorting_criteria
 
     def __ne__(self, other):
-        Element.comparison_counter += 1
+        counter = self.counter
+        counter.ne += 1
+        counter.remaining -= 1
+        if counter.remaining < 0:
+            raise ComparisonBudgetExceeded(counter.budget)
         return self.sorting_criteria != other.sorting_criteria
 
     def __floordiv__(self, other):
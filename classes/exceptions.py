@@ -25,15 +25,57 @@ class NoSortMethod(Exception):
         super().__init__(message)
 
 
-class IncorrectSorting(Exception):
+class TooSlowSorting(Exception):
     """
-    Provided sorting algorithm is incorrect
+    Sorting algorithm exceeded comparison budget
     """
-    def __init__(self, input_data, incorrect_result):
+    def __init__(self, size, budget):
         message = (
-            "Sorting algorithm is incorrect\n"
-            f"Input data: {[elem.sorting_criteria for elem in input_data]}\n"
-            f"Correct result: {[elem.sorting_criteria for elem in sorted(input_data)]}\n"
-            f"Incorrect result: {[elem.sorting_criteria for elem in incorrect_result]}\n"
+            "Sorting algorithm is too slow\n"
+            f"More than {budget} comparisons were made on {size} elements\n"
         )
+        self.size = size
+        self.budget = budget
         super().__init__(message)
+
+
+class ComparisonBudgetExceeded(BaseException):
+    """
+    Raised from inside of sorting algorithm to abort measurement.
+    Not an Exception subclass, so it isn't caught by except Exception in source code
+    """
+    def __init__(self, budget):
+        self.budget = budget
+        super().__init__(budget)
+
+
+class IncorrectSorting(Exception):
+    """
+    Provided sorting algorithm is incorrect.
+    Message is built only when exception is displayed
+    """
+    def __init__(self, input_data, incorrect_result, reason=None):
+        """
+        @param input_data: Elements or sorting criteria passed to sorting algorithm
+        @param incorrect_result: data returned to sorting algorithm
+        @param reason: description of what is wrong with the result
+        """
+        self.input_data = input_data
+        self.incorrect_result = incorrect_result
+        self.reason = reason
+        super().__init__(input_data, incorrect_result, reason)
+
+    @staticmethod
+    def _criteria(data):
+        return [getattr(elem, 'sorting_criteria', elem) for elem in data]
+
+    def __str__(self):
+        input_criteria = self._criteria(self.input_data)
+        message = "Sorting algorithm is incorrect\n"
+        if self.reason is not None:
+            message += f"{self.reason}\n"
+        return message + (
+            f"Input data: {input_criteria}\n"
+            f"Correct result: {sorted(input_criteria)}\n"
+            f"Incorrect result: {self._criteria(self.incorrect_result)}\n"
+        )
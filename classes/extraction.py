@@ -0,0 +1,282 @@
+import math
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import threading
+import time
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from classes.exceptions import ErrorInSorting, NoSortMethod, IncorrectSorting, TooSlowSorting
+from classes.feature_cache import source_hash
+
+
+class ExtractionResult(NamedTuple):
+    """
+    Outcome of characteristics extraction for a single source file.
+    Status is one of:
+    ok - characteristics were extracted,
+    incorrect - algorithm doesn't sort,
+    no_sort - sort function is missing,
+    too_slow - algorithm exceeded comparison budget,
+    error - source code raised an exception,
+    memory - memory limit was exceeded,
+    cpu_limit - CPU time limit was exceeded,
+    timeout - wall-clock time limit was exceeded,
+    crashed - worker process died
+    """
+    path: Path
+    status: str
+    characteristics: Any = None
+    message: str = ''
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+
+def _run_extractor(extractor, path):
+    """
+    @return: Tuple (status, characteristics or failure message)
+    """
+    try:
+        return 'ok', extractor(path)
+    except IncorrectSorting as e:
+        return 'incorrect', str(e)
+    except NoSortMethod as e:
+        return 'no_sort', str(e)
+    except TooSlowSorting as e:
+        return 'too_slow', str(e)
+    except ErrorInSorting as e:
+        return 'memory' if isinstance(e.exception, MemoryError) else 'error', str(e)
+    except MemoryError as e:
+        return 'memory', str(e)
+    except BaseException as e:
+        # SystemExit, KeyboardInterrupt and other exceptions raised by source code
+        return 'error', f'{type(e).__name__}: {e}'
+
+
+def _worker_loop(connection, extractor, memory_limit, cpu_limit):
+    """
+    Entry point of worker process. Receives paths and sends back (status, payload) until None is received
+    """
+    # Output of source code must not mix with output of parent process
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+    if memory_limit is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    _, cpu_hard_limit = resource.getrlimit(resource.RLIMIT_CPU)
+    recursion_limit = sys.getrecursionlimit()
+
+    while True:
+        try:
+            path = connection.recv()
+        except EOFError:
+            return
+        if path is None:
+            return
+
+        if cpu_limit is not None:
+            # CPU time is counted for the whole process life, so the limit is moved forward for every job
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            cpu_soft_limit = math.ceil(usage.ru_utime + usage.ru_stime) + math.ceil(cpu_limit)
+            if cpu_hard_limit != resource.RLIM_INFINITY:
+                cpu_soft_limit = min(cpu_soft_limit, cpu_hard_limit)
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_soft_limit, cpu_hard_limit))
+        sys.setrecursionlimit(recursion_limit)
+
+        connection.send(_run_extractor(extractor, path))
+
+
+class _Worker:
+    """
+    Reusable worker process with its own resource limits
+    """
+    def __init__(self, extractor, memory_limit, cpu_limit):
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_loop,
+                                               args=(child_connection, extractor, memory_limit, cpu_limit),
+                                               daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.path = None
+        self.deadline = None
+        self.jobs_done = 0
+
+    def submit(self, path, timeout):
+        self.connection.send(path)
+        self.path = path
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def failure(self, cpu_limit):
+        """
+        @return: Tuple (status, message) describing why worker process died
+        """
+        self.process.join()
+        exitcode = self.process.exitcode
+        if exitcode == -signal.SIGXCPU:
+            return 'cpu_limit', f'Execution exceeded {cpu_limit} seconds of CPU time'
+        if exitcode is not None and exitcode < 0:
+            return 'crashed', f'Worker process was killed by {signal.Signals(-exitcode).name}'
+        return 'crashed', f'Worker process exited with code {exitcode}'
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class ParallelExtractor:
+    """
+    Extracts characteristics of many sorting algorithms in a pool of sandboxed worker processes.
+    Workers run source code under CPU time and address space limits and are reused between jobs.
+    A worker that exceeds wall-clock timeout, crashes or dies on a limit is replaced with a new one,
+    so a single hanging or crashing implementation can't stop the whole run
+    """
+    def __init__(self, extractor, workers=None, timeout=None, memory_limit=None, cpu_limit=None,
+                 max_jobs_per_worker=None):
+        """
+        @param extractor: function taking path to source code and returning its characteristics
+        @param workers: number of simultaneously running worker processes. Equals number of CPUs if not provided
+        @param timeout: wall-clock limit for a single job in seconds. Unlimited if not provided
+        @param memory_limit: address space limit of worker process in bytes. Unlimited if not provided
+        @param cpu_limit: CPU time limit for a single job in seconds. Unlimited if not provided
+        @param max_jobs_per_worker: number of jobs after which worker is restarted to drop state
+        left by source code. Unlimited if not provided
+        """
+        self.extractor = extractor
+        self.workers = workers or multiprocessing.cpu_count()
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._idle_workers = []
+        # Prediction server extracts characteristics for several clients from different threads
+        self._workers_lock = threading.Lock()
+
+    def _acquire_worker(self):
+        with self._workers_lock:
+            if self._idle_workers:
+                return self._idle_workers.pop()
+        return _Worker(self.extractor, self.memory_limit, self.cpu_limit)
+
+    def _release_worker(self, worker):
+        worker.path = None
+        worker.deadline = None
+        worker.jobs_done += 1
+        if self.max_jobs_per_worker is not None and worker.jobs_done >= self.max_jobs_per_worker:
+            worker.stop()
+        else:
+            with self._workers_lock:
+                self._idle_workers.append(worker)
+
+    def close(self):
+        """
+        Stops idle worker processes
+        """
+        with self._workers_lock:
+            idle_workers, self._idle_workers = self._idle_workers, []
+        for worker in idle_workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def imap(self, paths, cache=None, cache_namespace=''):
+        """
+        Extracts characteristics of given source files
+        @param paths: iterable of paths to source code
+        @param cache: FeatureCache for storing and reusing extracted characteristics
+        @param cache_namespace: prefix of cache keys, separates results of differently configured extractors
+        @return: Generator of ExtractionResult. Cached results go first, others in order of completion
+        """
+        if cache is None:
+            yield from self._imap_workers(paths)
+            return
+
+        keys = {}
+        for path in paths:
+            try:
+                key = source_hash(Path(path).read_bytes())
+            except OSError as e:
+                # Reported the same way as by a worker that fails to read the file
+                yield ExtractionResult(path, 'error', message=f'{type(e).__name__}: {e}')
+                continue
+            if cache_namespace:
+                key = f'{cache_namespace}:{key}'
+            entry = cache.get(key, path)
+            if entry is None:
+                keys[path] = key
+            elif entry['status'] == 'ok':
+                yield ExtractionResult(path, 'ok', characteristics=entry['characteristics'])
+            else:
+                yield ExtractionResult(path, entry['status'], message=entry['message'])
+
+        for result in self._imap_workers(keys):
+            if result.ok:
+                cache.put(keys[result.path], result.status, result.characteristics)
+            else:
+                cache.put(keys[result.path], result.status, message=result.message, path=result.path)
+            yield result
+
+    def _imap_workers(self, paths):
+        paths = iter(paths)
+        busy = {}
+        try:
+            while True:
+                while len(busy) < self.workers:
+                    path = next(paths, None)
+                    if path is None:
+                        break
+                    worker = self._acquire_worker()
+                    worker.submit(path, self.timeout)
+                    busy[worker.connection] = worker
+                if not busy:
+                    return
+
+                deadlines = [worker.deadline for worker in busy.values() if worker.deadline is not None]
+                wait_time = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+                for connection in wait(list(busy), timeout=wait_time):
+                    worker = busy.pop(connection)
+                    path = worker.path
+                    try:
+                        status, payload = connection.recv()
+                    except (EOFError, OSError):
+                        status, payload = worker.failure(self.cpu_limit)
+                        worker.kill()
+                    else:
+                        self._release_worker(worker)
+
+                    if status == 'ok':
+                        yield ExtractionResult(path, status, characteristics=payload)
+                    else:
+                        yield ExtractionResult(path, status, message=payload)
+
+                now = time.monotonic()
+                for connection, worker in list(busy.items()):
+                    if worker.deadline is not None and worker.deadline <= now:
+                        del busy[connection]
+                        worker.kill()
+                        yield ExtractionResult(worker.path, 'timeout',
+                                               message=f'Execution exceeded {self.timeout} seconds')
+        finally:
+            # Jobs of abandoned iteration can't be finished
+            for worker in busy.values():
+                worker.kill()
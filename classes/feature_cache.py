@@ -0,0 +1,166 @@
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from classes import characteristics, distributions, large_stack, profiling, verification
+from classes.element import Element
+from classes.exceptions import TooSlowSorting
+from classes.features import FEATURE_GROUPS, feature_dtypes
+from classes.instrumented_list import InstrumentedList
+from classes.performance_analysis import PerformanceAnalyser
+from classes.syntax_analysis import SyntaxAnalyser
+
+# Outcomes that depend only on source code. Time and memory limits may change between runs
+CACHEABLE_STATUSES = ('ok', 'incorrect', 'no_sort', 'too_slow', 'error')
+# Entries are shared by all files with the same source code, so stored messages don't contain paths
+PATH_PLACEHOLDER = '<path to source code>'
+# Changes whenever layout of stored entries changes
+ENTRY_FORMAT = 2
+
+
+def extractor_version():
+    """
+    Fingerprint of characteristics extractors.
+    Changes whenever test data, Element semantics, verification of results or set of extracted characteristics change
+    @return: Hex digest string
+    """
+    fingerprint = hashlib.sha256()
+    fingerprint.update(f'entry format {ENTRY_FORMAT}'.encode())
+    for test_data in [PerformanceAnalyser.ordered_data, PerformanceAnalyser.shuffled_data,
+                      PerformanceAnalyser.nearly_sorted_data, PerformanceAnalyser.stable_check_data]:
+        fingerprint.update(repr(test_data).encode())
+    modules = [characteristics, distributions, large_stack, profiling, verification]
+    modules += [inspect.getmodule(source_object) for source_object in
+                [Element, InstrumentedList, PerformanceAnalyser, SyntaxAnalyser, TooSlowSorting]]
+    for module in modules:
+        fingerprint.update(inspect.getsource(module).encode())
+    fingerprint.update(repr(feature_dtypes(FEATURE_GROUPS)).encode())
+    return fingerprint.hexdigest()
+
+
+def source_hash(source):
+    """
+    @param source: source code as bytes
+    @return: Hex digest identifying source code
+    """
+    return hashlib.sha256(source).hexdigest()
+
+
+def cache_namespace(groups=()):
+    """
+    Characteristics extracted with different optional feature groups are stored under different keys
+    @param groups: names of optional feature groups
+    @return: Prefix of cache keys
+    """
+    return ','.join(groups)
+
+
+class FeatureCache:
+    """
+    Persistent storage of extracted characteristics keyed by hash of source code.
+    Least recently used entries are evicted when total size exceeds the limit.
+    Storage is cleared automatically when extractor version changes
+    """
+    def __init__(self, path, max_bytes, version=None):
+        """
+        @param path: directory of the cache. Created if missing
+        @param max_bytes: maximum total size of stored entries
+        @param version: extractor version. Calculated with extractor_version if not provided
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.version = version or extractor_version()
+
+        # Connection is shared by threads of prediction server, every operation holds the lock
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self.path / 'features.sqlite', check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS entries '
+                                 '(key TEXT PRIMARY KEY, value TEXT, size INTEGER, last_access REAL)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)')
+
+        stored_version = self._connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if stored_version is None or stored_version[0] != self.version:
+            self.clear()
+        self._connection.commit()
+        self._total_size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def clear(self):
+        """
+        Removes all entries and marks storage with current extractor version
+        """
+        with self._lock:
+            self._connection.execute('DELETE FROM entries')
+            self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+            self._total_size = 0
+
+    def get(self, key, path=None):
+        """
+        @param key: hash of source code
+        @param path: path to source code inserted into stored message
+        @return: Stored entry as dictionary with status, characteristics and message keys. None if missing
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+            # Write lock is released at once, so long-lived users like prediction server don't block other processes
+            self._connection.commit()
+        entry = json.loads(row[0])
+        if path is not None:
+            entry['message'] = entry['message'].replace(PATH_PLACEHOLDER, str(path))
+        return entry
+
+    def put(self, key, status, characteristics=None, message='', path=None):
+        """
+        Stores extraction outcome. Outcomes caused by resource limits are not stored
+        @param key: hash of source code
+        @param status: extraction status
+        @param characteristics: dictionary of characteristics
+        @param message: failure message
+        @param path: path to source code, replaced with placeholder in stored message
+        """
+        if status not in CACHEABLE_STATUSES:
+            return
+        if path is not None:
+            message = message.replace(str(path), PATH_PLACEHOLDER)
+        value = json.dumps({'status': status, 'characteristics': characteristics, 'message': message})
+        with self._lock:
+            replaced = self._connection.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            if replaced is not None:
+                self._total_size -= replaced[0]
+            self._total_size += len(value)
+            self._connection.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                                     (key, value, len(value), time.time()))
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        if self._total_size <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._connection.execute('SELECT key, size FROM entries ORDER BY last_access'):
+            if self._total_size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self._total_size -= size
+        self._connection.executemany('DELETE FROM entries WHERE key = ?', evicted)
+
+    def close(self):
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from classes.feature_cache import source_hash
+from classes.features import feature_dtypes
+
+FORMAT_VERSION = 2
+META_COLUMNS = ['path', 'hash', 'label', 'version', 'status', 'message']
+# Free text of very different length. Stored as UTF-8 bytes with row offsets instead of fixed-width strings
+VARIABLE_COLUMNS = ('path', 'message')
+
+
+def _encode_strings(values):
+    """
+    @param values: array of strings
+    @return: Tuple (array of UTF-8 bytes of all strings, array of row offsets, one longer than values)
+    """
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_strings(data, offsets):
+    """
+    @return: Object array of strings, inverse of _encode_strings
+    """
+    data = bytes(data)
+    return np.array([data[start:end].decode() for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())],
+                    dtype=object)
+
+
+class FeatureDataset:
+    """
+    Columnar table of extracted characteristics. Every row describes one source file: its path relative to dataset,
+    hash of source code, label, version of extractor, extraction status and message, and characteristics.
+    Stored as a directory with one .npy file per column and meta.json, so columns are memory-mapped on load.
+    Paths and messages are stored as UTF-8 bytes with offsets and decoded on load
+    Characteristics of failed rows are zeros
+    """
+    def __init__(self, columns, groups=()):
+        """
+        @param columns: dictionary of equally long arrays by column names, META_COLUMNS first
+        @param groups: names of optional feature groups of characteristics
+        """
+        self.columns = columns
+        self.groups = tuple(groups)
+
+    def __len__(self):
+        return len(self.columns['path'])
+
+    @property
+    def feature_columns(self):
+        return [column for column in self.columns if column not in META_COLUMNS]
+
+    @classmethod
+    def from_frame(cls, frame, groups=()):
+        """
+        @param frame: dataframe with META_COLUMNS and characteristics of given groups
+        """
+        columns = {column: np.array([str(value) for value in frame[column]],
+                                    dtype=object if column in VARIABLE_COLUMNS else str)
+                   for column in META_COLUMNS}
+        for column, dtype in feature_dtypes(groups).items():
+            values = frame[column].where(frame['status'] == 'ok', 0) if len(frame) else frame[column]
+            columns[column] = values.to_numpy(dtype=dtype)
+        return cls(columns, groups)
+
+    @classmethod
+    def from_results(cls, results, labels, root, version, groups=(), hashes=None):
+        """
+        @param results: ExtractionResults
+        @param labels: dictionary of labels by paths to source code
+        @param root: dataset directory. Paths are stored relative to it
+        @param version: extractor version
+        @param groups: names of optional feature groups of characteristics
+        @param hashes: dictionary of source hashes by relative path. Computed if not provided
+        """
+        dtypes = feature_dtypes(groups)
+        rows = []
+        for result in results:
+            relative_path = Path(result.path).relative_to(root).as_posix()
+            source = hashes[relative_path] if hashes is not None else source_hash(Path(result.path).read_bytes())
+            characteristics = result.characteristics if result.ok else {}
+            rows.append({'path': relative_path, 'hash': source, 'label': labels[result.path], 'version': version,
+                         'status': result.status, 'message': result.message,
+                         **{column: characteristics.get(column, 0) for column in dtypes}})
+        return cls.from_frame(pd.DataFrame(rows, columns=META_COLUMNS + list(dtypes)), groups)
+
+    def to_frame(self):
+        """
+        @return: Dataframe of all rows and columns
+        """
+        return pd.DataFrame({column: np.asarray(values) for column, values in self.columns.items()})
+
+    def extracted(self, labels=None):
+        """
+        @param labels: labels of rows to select. All labels if None
+        @return: Boolean mask of successfully extracted rows with given labels
+        """
+        selected = np.asarray(self.columns['status']) == 'ok'
+        if labels is not None:
+            selected &= np.isin(self.columns['label'], list(labels))
+        return selected
+
+    def training_frame(self, columns=None, labels=None):
+        """
+        @param columns: feature columns in model order. All characteristics of dataset if None
+        @param labels: labels of rows to keep. All labels if None
+        @return: Dataframe of characteristics and sorting_algorithm column of rows selected by extracted
+        """
+        columns = self.feature_columns if columns is None else list(columns)
+        missing = [column for column in columns if column not in self.columns]
+        if missing:
+            raise KeyError(f'Feature dataset has no columns {missing}')
+        selected = self.extracted(labels)
+        frame = pd.DataFrame({column: np.asarray(self.columns[column])[selected] for column in columns})
+        frame['sorting_algorithm'] = np.asarray(self.columns['label'])[selected].astype(object)
+        return frame
+
+    def save(self, path):
+        """
+        Writes dataset into a temporary directory and renames it, so readers never see half-written dataset
+        @param path: dataset directory. Replaced if exists
+        """
+        path = Path(path)
+        temporary_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        if temporary_path.exists():
+            shutil.rmtree(temporary_path)
+        temporary_path.mkdir(parents=True)
+
+        meta = {'format': FORMAT_VERSION, 'groups': list(self.groups), 'rows': len(self), 'columns': []}
+        for i, (column, values) in enumerate(self.columns.items()):
+            file_name = f'{i}.npy'
+            if column in VARIABLE_COLUMNS:
+                data, offsets = _encode_strings(values)
+                np.save(temporary_path / file_name, data)
+                np.save(temporary_path / f'{i}.offsets.npy', offsets)
+                meta['columns'].append({'name': column, 'file': file_name, 'offsets': f'{i}.offsets.npy'})
+            else:
+                np.save(temporary_path / file_name, np.ascontiguousarray(values))
+                meta['columns'].append({'name': column, 'file': file_name})
+        with open(temporary_path / 'meta.json', 'w') as meta_file:
+            json.dump(meta, meta_file)
+
+        if path.exists():
+            previous_path = path.with_name(f'{path.name}.{os.getpid()}.old')
+            os.replace(path, previous_path)
+            os.replace(temporary_path, path)
+            shutil.rmtree(previous_path)
+        else:
+            os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        @param path: dataset directory
+        @param mmap_mode: memory-mapping mode of numpy.load. Columns are read into memory if None
+        @return: FeatureDataset
+        """
+        path = Path(path)
+        with open(path / 'meta.json') as meta_file:
+            meta = json.load(meta_file)
+        if meta['format'] != FORMAT_VERSION:
+            raise ValueError(f'Unsupported feature dataset format {meta["format"]}')
+        columns = {}
+        for column in meta['columns']:
+            values = np.load(path / column['file'], mmap_mode=mmap_mode)
+            if 'offsets' in column:
+                values = _decode_strings(values, np.load(path / column['offsets'], mmap_mode=mmap_mode))
+            columns[column['name']] = values
+        return cls(columns, meta['groups'])
@@ -0,0 +1,104 @@
+import pandas as pd
+
+PERFORMANCE_FEATURES = {
+    'Comparisons on sorted data': 'int64',
+    'Comparisons on reversed data': 'int64',
+    'Comparisons on shuffled data': 'int64',
+    'Comparisons on nearly sorted data': 'int64',
+    'is_stable': 'bool',
+}
+SYNTAX_FEATURES = {
+    'is_recursive': 'bool',
+    'number_of_cycles': 'int64',
+    'number_of_nested_cycles': 'int64',
+}
+FEATURE_DTYPES = {**PERFORMANCE_FEATURES, **SYNTAX_FEATURES}
+FEATURE_COLUMNS = list(FEATURE_DTYPES)
+
+# Optional characteristics. They are extracted only on request, so default columns stay compatible
+# with already trained classifiers
+MOVEMENT_FEATURES = {
+    'Reads on shuffled data': 'int64',
+    'Writes on shuffled data': 'int64',
+    'Swaps on shuffled data': 'int64',
+    'Auxiliary allocations on shuffled data': 'int64',
+    'Slice copies on shuffled data': 'int64',
+}
+SCALING_FEATURES = {
+    f'Growth {parameter} on {distribution} data': 'float64'
+    for distribution in ['sorted', 'reversed', 'shuffled', 'nearly sorted'] for parameter in ['exponent', 'constant']
+}
+DISTRIBUTION_FEATURES = {
+    **{f'Comparisons on {distribution} data': 'int64'
+       for distribution in ['few unique', 'many duplicates', 'organ pipe', 'sawtooth']},
+    'is_stable on generated data': 'bool',
+}
+# Time and memory depend on machine, so these features are not comparable between environments
+PROFILING_FEATURES = {
+    f'{characteristic} on {name} data': 'int64'
+    for name in ['sorted', 'reversed', 'shuffled', 'nearly sorted']
+    for characteristic in ['Time', 'Peak memory', 'Function calls']
+}
+RECURSION_FEATURES = {
+    f'Call depth on {name} data': 'int64' for name in ['sorted', 'reversed', 'shuffled', 'nearly sorted']
+}
+FEATURE_GROUPS = {
+    'movement': MOVEMENT_FEATURES,
+    'scaling': SCALING_FEATURES,
+    'distributions': DISTRIBUTION_FEATURES,
+    'recursion': RECURSION_FEATURES,
+    'profiling': PROFILING_FEATURES,
+}
+
+
+def feature_dtypes(groups=()):
+    """
+    @param groups: names of optional feature groups
+    @return: Dictionary of column types of default and requested features
+    """
+    dtypes = dict(FEATURE_DTYPES)
+    for group in groups:
+        dtypes.update(FEATURE_GROUPS[group])
+    return dtypes
+
+
+def feature_columns(groups=()):
+    """
+    @param groups: names of optional feature groups
+    @return: List of default and requested feature columns in model order
+    """
+    return list(feature_dtypes(groups))
+
+
+def groups_of_columns(columns):
+    """
+    Finds optional feature groups needed to extract given columns, e.g. features of trained classifier
+    @param columns: feature column names
+    @return: Tuple of group names in FEATURE_GROUPS order
+    """
+    columns = set(columns)
+    return tuple(group for group, group_features in FEATURE_GROUPS.items() if columns & set(group_features))
+
+
+def to_row(characteristics, columns=FEATURE_COLUMNS):
+    """
+    @param characteristics: dictionary of algorithm characteristics
+    @param columns: order of characteristics
+    @return: Tuple of characteristics in given order
+    """
+    return tuple(characteristics[column] for column in columns)
+
+
+def to_frame(rows, columns=FEATURE_COLUMNS, dtypes=None):
+    """
+    Builds dataframe from collected characteristics at once
+    @param rows: list of tuples or dictionaries of characteristics
+    @param columns: column names
+    @param dtypes: dictionary of column types. Types of all known features are used if not provided
+    @return: Dataframe with given columns
+    """
+    if dtypes is None:
+        dtypes = feature_dtypes(FEATURE_GROUPS)
+    rows = [to_row(row, columns) if isinstance(row, dict) else row for row in rows]
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    return frame.astype({column: dtype for column, dtype in dtypes.items() if column in frame.columns})
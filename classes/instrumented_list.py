@@ -0,0 +1,123 @@
+class MovementCounter:
+    """
+    Measurement context for data movement performed by sorting algorithm
+    """
+    __slots__ = ('reads', 'writes', 'swaps', 'allocations', 'slice_copies')
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.swaps = 0
+        self.allocations = 0
+        self.slice_copies = 0
+
+    def as_dict(self):
+        """
+        :return: Dictionary of counts by operation name
+        """
+        return {operation: getattr(self, operation) for operation in self.__slots__}
+
+
+class InstrumentedList(list):
+    """
+    List that counts element reads, writes and swaps made through it.
+    reads - elements read by index, slicing, iteration or pop,
+    writes - elements stored by index, slice assignment, append, insert or extend,
+    swaps - pairs of writes exchanging two elements, like a[i], a[j] = a[j], a[i],
+    allocations - new lists derived from instrumented one by slicing, concatenation, repetition or copy,
+    slice_copies - elements copied into derived lists.
+    Derived lists are instrumented with the same counter, so work done on halves of data is counted too
+    """
+    __slots__ = ('counter', '_last_write')
+
+    def __init__(self, iterable=(), counter=None):
+        super().__init__(iterable)
+        self.counter = counter if counter is not None else MovementCounter()
+        # (index, written element, displaced element) of the previous write, used for swap detection
+        self._last_write = None
+
+    def _derive(self, elements):
+        counter = self.counter
+        derived = InstrumentedList(elements, counter)
+        counter.allocations += 1
+        counter.slice_copies += len(derived)
+        return derived
+
+    def __getitem__(self, index):
+        if index.__class__ is slice:
+            derived = self._derive(list.__getitem__(self, index))
+            self.counter.reads += len(derived)
+            return derived
+        self.counter.reads += 1
+        return list.__getitem__(self, index)
+
+    def __setitem__(self, index, value):
+        if index.__class__ is slice:
+            value = list(value)
+            self.counter.writes += len(value)
+            self._last_write = None
+            list.__setitem__(self, index, value)
+            return
+
+        displaced = list.__getitem__(self, index)
+        last_write = self._last_write
+        # Second write of a swap puts element displaced by the first write where the written element came from
+        if last_write is not None and value is last_write[2] and displaced is last_write[1] and \
+                index != last_write[0]:
+            self.counter.swaps += 1
+            self._last_write = None
+        else:
+            self._last_write = (index, value, displaced)
+        self.counter.writes += 1
+        list.__setitem__(self, index, value)
+
+    def __delitem__(self, index):
+        self._last_write = None
+        list.__delitem__(self, index)
+
+    def __iter__(self):
+        counter = self.counter
+        for element in list.__iter__(self):
+            counter.reads += 1
+            yield element
+
+    def __add__(self, other):
+        self.counter.reads += len(self)
+        return self._derive(list.__add__(self, list(other)))
+
+    def __radd__(self, other):
+        self.counter.reads += len(self)
+        return self._derive(list(other) + list(list.__iter__(self)))
+
+    def __mul__(self, times):
+        self.counter.reads += len(self)
+        return self._derive(list.__mul__(self, times))
+
+    __rmul__ = __mul__
+
+    def copy(self):
+        self.counter.reads += len(self)
+        return self._derive(list.__iter__(self))
+
+    def append(self, value):
+        self.counter.writes += 1
+        list.append(self, value)
+
+    def insert(self, index, value):
+        self.counter.writes += 1
+        self._last_write = None
+        list.insert(self, index, value)
+
+    def extend(self, values):
+        values = list(values)
+        self.counter.writes += len(values)
+        list.extend(self, values)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def pop(self, index=-1):
+        self.counter.reads += 1
+        self._last_write = None
+        return list.pop(self, index)
@@ -0,0 +1,65 @@
+import contextlib
+import sys
+import threading
+
+_limit_lock = threading.Lock()
+_limit_users = 0
+_previous_limit = None
+_stack_size_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def scoped_recursion_limit(limit):
+    """
+    Raises recursion limit for the duration of with block and restores it afterwards.
+    Recursion limit is shared by all threads, so nested and concurrent scopes keep the highest limit
+    until the last of them exits
+    @param limit: recursion limit inside with block
+    """
+    global _limit_users, _previous_limit
+    with _limit_lock:
+        if _limit_users == 0:
+            _previous_limit = sys.getrecursionlimit()
+        _limit_users += 1
+        if limit > sys.getrecursionlimit():
+            sys.setrecursionlimit(limit)
+    try:
+        yield
+    finally:
+        with _limit_lock:
+            _limit_users -= 1
+            if _limit_users == 0:
+                sys.setrecursionlimit(_previous_limit)
+
+
+def call_with_large_stack(function, stack_size, recursion_limit):
+    """
+    Calls function in a separate thread with enlarged stack, so deep recursion doesn't overflow
+    the stack of the calling thread. Exception raised by function is raised again in the calling thread
+    @param function: function without arguments
+    @param stack_size: stack size of the thread in bytes
+    @param recursion_limit: recursion limit while function runs
+    @return: Result of function
+    """
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = function()
+        except BaseException as e:
+            outcome['exception'] = e
+
+    with scoped_recursion_limit(recursion_limit):
+        # Stack size applies to threads created after the call, so it is restored right after start
+        with _stack_size_lock:
+            previous_stack_size = threading.stack_size(stack_size)
+            try:
+                thread = threading.Thread(target=target, daemon=True)
+                thread.start()
+            finally:
+                threading.stack_size(previous_stack_size)
+        thread.join()
+
+    if 'exception' in outcome:
+        raise outcome['exception']
+    return outcome.get('result')
@@ -1,9 +1,27 @@
-import copy
+import contextlib
+import functools
+import statistics
+from typing import Any, NamedTuple, Optional
 
-import pandas as pd
+import numpy as np
 
-from classes.element import Element
-from classes.exceptions import ErrorInSorting, IncorrectSorting
+from classes import distributions
+from classes.element import ComparisonCounter, Element
+from classes.exceptions import ComparisonBudgetExceeded, ErrorInSorting, IncorrectSorting, TooSlowSorting
+from classes.instrumented_list import InstrumentedList
+from classes.large_stack import call_with_large_stack
+from classes.profiling import CallProfiler, MemoryProbe, Timer
+from classes.verification import verify
+
+
+class MeasuredRun(NamedTuple):
+    """
+    Outcome of a single verified run of sorting algorithm
+    """
+    data: Any
+    counter: ComparisonCounter
+    # None if test data has no equal elements and stability can't be observed
+    is_stable: Optional[bool]
 
 
 class PerformanceAnalyser:
@@ -26,84 +44,348 @@ class PerformanceAnalyser:
                               69, 71, 70, 72, 73, 74, 75, 79, 76, 77, 80, 83, 82, 81, 78, 85, 84, 87, 86, 88, 89, 92,
                               91, 90, 94, 93, 95, 97, 96, 98, 99]
 
-    ordered_data = [Element(x, x) for x in range(100)]
-    shuffled_data = [Element(shuffled_element, i) for i, shuffled_element in enumerate(shuffled_elements)]
-    nearly_sorted_data = [Element(x, i) for i, x in enumerate(nearly_sorted_elements)]
-    stable_check_data = [Element(element, i) for i, element in enumerate(elements_for_stable_check)]
+    # Test data is kept as immutable templates of (sorting_criteria, sequential_id) pairs.
+    # Every run gets freshly built Elements, so nothing done by sorting algorithm can leak into the next run
+    ordered_data = tuple((x, x) for x in range(100))
+    shuffled_data = tuple((shuffled_element, i) for i, shuffled_element in enumerate(shuffled_elements))
+    nearly_sorted_data = tuple((x, i) for i, x in enumerate(nearly_sorted_elements))
+    stable_check_data = tuple((element, i) for i, element in enumerate(elements_for_stable_check))
+
+    # Every run may use at most factor * n^2 comparisons. That is several times more than quadratic algorithms need,
+    # so only pathological implementations are aborted
+    comparison_budget_factor = 4
+
+    # Additional distributions measured by 'distributions' feature group. Legacy data above stays the default
+    battery = ('few unique', 'many duplicates', 'organ pipe', 'sawtooth')
+    battery_size = 100
+
+    # Sorting algorithms run in a separate thread with large stack, so deep recursion on large data
+    # doesn't require raising recursion limit of the whole program
+    thread_stack_size = 64 * 1024 * 1024
+    recursion_limit = 20000
+
+    # Profiling repeats timed runs and takes median time
+    profiling_repeats = 5
+
+    # Scaling mode runs algorithm on growing data while total number of comparisons fits the budget.
+    # Curve of a distribution isn't continued once local growth exponent shows quadratic algorithm
+    scaling_distributions = ('sorted', 'reversed', 'shuffled', 'nearly sorted')
+    scaling_sizes = (16, 32, 64, 128, 256, 512)
+    scaling_budget = 1_000_000
+    quadratic_exponent = 1.8
+
+    @staticmethod
+    def make_template(data):
+        """
+        Converts data for sorting to immutable template
+        :param data: template, list of Elements or list of sorting criteria
+        :return: Tuple of (sorting_criteria, sequential_id) pairs
+        """
+        if isinstance(data, tuple) and all(isinstance(pair, tuple) for pair in data):
+            return data
+        return tuple((elem.sorting_criteria, elem.sequential_id) if isinstance(elem, Element) else (elem, i)
+                     for i, elem in enumerate(data))
+
+    @staticmethod
+    def instantiate(template, counter=None):
+        """
+        :param template: tuple of (sorting_criteria, sequential_id) pairs
+        :param counter: ComparisonCounter for new Elements. Elements get their own counters if not provided
+        :return: New list of Elements
+        """
+        return [Element(sorting_criteria, sequential_id, counter) for sorting_criteria, sequential_id in template]
 
     @classmethod
-    def count_comparisons(cls, sorting_algorithm, data):
+    def comparison_budget(cls, size):
         """
-        Measures comparisons performed by sorting algorithm on given data
+        :param size: number of elements
+        :return: Maximal number of comparisons allowed for sorting given number of elements
+        """
+        return cls.comparison_budget_factor * size * size + size
+
+    @classmethod
+    def run_algorithm(cls, sorting_algorithm, template, container=list, probe=None):
+        """
+        Sorts fresh Elements built from template under comparison budget.
+        Correctness, stability and comparison counts are all taken from this single run
         :param sorting_algorithm: sorting function
-        :param data: data for sorting
-        :return: Number of comparisons performed
+        :param template: tuple of (sorting_criteria, sequential_id) pairs
+        :param container: type of sequence passed to sorting algorithm
+        :param probe: context manager measuring the call of sorting algorithm, e.g. classes.profiling.Timer
+        :return: MeasuredRun
         """
-        sorted_data = copy.deepcopy(data)
-        Element.reset_counter()
+        budget = cls.comparison_budget(len(template))
+        counter = ComparisonCounter(budget)
+        data = container(cls.instantiate(template, counter))
+
+        def sort():
+            # Probe is entered in the thread running sorting algorithm, profilers are per thread
+            with probe if probe is not None else contextlib.nullcontext():
+                sorting_algorithm(data)
 
         try:
-            sorting_algorithm(sorted_data)
+            call_with_large_stack(sort, cls.thread_stack_size, cls.recursion_limit)
+        except ComparisonBudgetExceeded:
+            raise TooSlowSorting(len(template), budget)
         except Exception as e:
             raise ErrorInSorting(e)
+        # Source code could have caught ComparisonBudgetExceeded itself
+        if counter.exceeded:
+            raise TooSlowSorting(len(template), budget)
 
-        if not cls.is_sorted(sorted_data):
-            raise IncorrectSorting(data, sorted_data)
+        # Plain list copy reads elements around overridden methods of instrumented containers
+        verification = verify(list.copy(data), template)
+        if not verification.ok:
+            if verification.is_permutation:
+                reason = 'Result is not sorted'
+            else:
+                reason = 'Elements were replaced, lost or duplicated'
+            raise IncorrectSorting([sorting_criteria for sorting_criteria, _ in template], list.copy(data), reason)
+        # Verification used to compare n - 1 neighbouring Elements with <=.
+        # Trained classifiers expect these comparisons in the counts
+        counter.le += max(len(template) - 1, 0)
+        return MeasuredRun(data, counter, verification.is_stable)
 
-        return Element.comparison_counter
+    @classmethod
+    def count_operations(cls, sorting_algorithm, data):
+        """
+        Measures comparisons performed by sorting algorithm on given data separately for every operator.
+        Every call uses its own counter, so measurements can run concurrently
+        :param sorting_algorithm: sorting function
+        :param data: template, list of Elements or list of sorting criteria
+        :return: ComparisonCounter
+        """
+        return cls.run_algorithm(sorting_algorithm, cls.make_template(data)).counter
+
+    @classmethod
+    def count_comparisons(cls, sorting_algorithm, data):
+        """
+        Measures comparisons performed by sorting algorithm on given data
+        :param sorting_algorithm: sorting function
+        :param data: template, list of Elements or list of sorting criteria
+        :return: Number of comparisons performed
+        """
+        return cls.count_operations(sorting_algorithm, data).total
+
+    @classmethod
+    def count_movements(cls, sorting_algorithm, data):
+        """
+        Measures data movement performed by sorting algorithm on given data
+        :param sorting_algorithm: sorting function
+        :param data: template, list of Elements or list of sorting criteria
+        :return: MovementCounter
+        """
+        return cls.run_algorithm(sorting_algorithm, cls.make_template(data), InstrumentedList).data.counter
+
+    @classmethod
+    def measure_movement(cls, algorithm):
+        """
+        Measures data movement of sorting algorithm on shuffled data
+        :param algorithm: sorting function
+        :return: Dictionary containing data movement characteristics
+        """
+        return cls.movement_characteristics(cls.count_movements(algorithm, cls.shuffled_data))
 
     @staticmethod
-    def is_sorted(data):
-        return all(data[i] <= data[i + 1] for i in range(len(data) - 1))
+    def movement_characteristics(counter):
+        """
+        :param counter: MovementCounter of run on shuffled data
+        :return: Dictionary containing data movement characteristics
+        """
+        return {
+            'Reads on shuffled data': counter.reads,
+            'Writes on shuffled data': counter.writes,
+            'Swaps on shuffled data': counter.swaps,
+            'Auxiliary allocations on shuffled data': counter.allocations,
+            'Slice copies on shuffled data': counter.slice_copies,
+        }
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def distribution_template(distribution, size, seed=0):
+        """
+        Builds test data from registered distribution. Data is the same for every call
+        :param distribution: name of distribution from classes.distributions
+        :param size: number of elements
+        :param seed: seed of random generator
+        :return: Template of (sorting_criteria, sequential_id) pairs
+        """
+        return tuple((x, i) for i, x in enumerate(distributions.generate(distribution, size, seed).tolist()))
 
     @classmethod
-    def check_stability(cls, sorting_algorithm):
+    def profile(cls, algorithm, template):
         """
-        Checks if sorting algorithm is stable
-        :param sorting_algorithm:
-        :return: Bool value. True if algorithm is stable, False otherwise
+        Measures running time, peak allocated memory and Python function calls of sorting algorithm.
+        Every probe gets its own runs, so probes don't distort each other's results
+        :param algorithm: sorting function
+        :param template: tuple of (sorting_criteria, sequential_id) pairs
+        :return: Dictionary with median time in nanoseconds, times of all repeats, peak memory in bytes,
+        total number of calls and numbers of calls by function
         """
-        sorted_data = cls.stable_check_data.copy()
+        times = []
+        for _ in range(cls.profiling_repeats):
+            timer = Timer()
+            cls.run_algorithm(algorithm, template, probe=timer)
+            times.append(timer.elapsed)
+        memory_probe = MemoryProbe()
+        cls.run_algorithm(algorithm, template, probe=memory_probe)
+        call_profiler = CallProfiler()
+        cls.run_algorithm(algorithm, template, probe=call_profiler)
+        return {
+            'time': int(statistics.median(times)),
+            'times': times,
+            'peak_memory': memory_probe.peak,
+            'calls': call_profiler.total,
+            'calls_by_function': call_profiler.calls,
+            'max_depth': call_profiler.max_depth,
+        }
 
-        try:
-            sorting_algorithm(sorted_data)
-        except Exception as e:
-            raise ErrorInSorting(e)
+    @classmethod
+    def profile_report(cls, algorithm):
+        """
+        :param algorithm: sorting function
+        :return: Dictionary of profile results (see profile) by name of test data
+        """
+        return {name: cls.profile(algorithm, template) for name, template in cls.comparison_data()}
+
+    @classmethod
+    def comparison_data(cls):
+        """
+        :return: List of (name, template) pairs of test data used for default comparison characteristics
+        """
+        return [('sorted', cls.ordered_data), ('reversed', cls.ordered_data[::-1]),
+                ('shuffled', cls.shuffled_data), ('nearly sorted', cls.nearly_sorted_data)]
 
-        if not cls.is_sorted(sorted_data):
-            raise IncorrectSorting(cls.stable_check_data, sorted_data)
-        return PerformanceAnalyser.sequential_are_ascending(sorted_data)
+    @classmethod
+    def measure_profiling(cls, algorithm):
+        """
+        Measures running time, memory and function calls of sorting algorithm on every test data
+        :param algorithm: sorting function
+        :return: Dictionary containing profiling characteristics
+        """
+        characteristics = {}
+        for name, profile in cls.profile_report(algorithm).items():
+            characteristics[f'Time on {name} data'] = profile['time']
+            characteristics[f'Peak memory on {name} data'] = profile['peak_memory']
+            characteristics[f'Function calls on {name} data'] = profile['calls']
+        return characteristics
+
+    @classmethod
+    def measure_distributions(cls, algorithm, battery=None, size=None, seed=0):
+        """
+        Measures comparisons on generated distributions
+        :param algorithm: sorting function
+        :param battery: names of distributions. PerformanceAnalyser.battery if not provided
+        :param size: number of elements. PerformanceAnalyser.battery_size if not provided
+        :param seed: seed of random generator
+        :return: Dictionary containing comparisons on every distribution
+        """
+        size = size or cls.battery_size
+        characteristics = {}
+        is_stable = True
+        for distribution in battery or cls.battery:
+            run = cls.run_algorithm(algorithm, cls.distribution_template(distribution, size, seed))
+            characteristics[f'Comparisons on {distribution} data'] = run.counter.total
+            # Runs on data with equal elements show stability at no extra cost
+            is_stable = is_stable and run.is_stable is not False
+        characteristics['is_stable on generated data'] = is_stable
+        return characteristics
+
+    @staticmethod
+    def fit_growth(curve):
+        """
+        Fits comparisons = constant * size ^ exponent with least squares in log-log scale
+        :param curve: list of (size, comparisons) pairs, at least two
+        :return: Tuple (exponent, constant)
+        """
+        sizes, comparisons = np.array(curve, dtype=np.float64).T
+        design = np.column_stack([np.log(sizes), np.ones_like(sizes)])
+        (exponent, log_constant), *_ = np.linalg.lstsq(design, np.log(comparisons), rcond=None)
+        return float(exponent), float(np.exp(log_constant))
 
     @staticmethod
-    def sequential_are_ascending(data):
+    def local_exponent(curve):
         """
-        Checks if sequential criteria of equal elements next to each other are in ascending order
-        :param data: List of Elements
-        :return: True if ascending, False otherwise
+        :param curve: list of (size, comparisons) pairs, at least two
+        :return: Growth exponent between two last points of curve
         """
-        for i in range(1, len(data)):
-            if data[i].sorting_criteria == data[i - 1].sorting_criteria and \
-                    data[i].sequential_id < data[i - 1].sequential_id:
-                return False
-        return True
+        (previous_size, previous_comparisons), (size, comparisons) = curve[-2:]
+        return np.log(comparisons / previous_comparisons) / np.log(size / previous_size)
 
     @classmethod
-    def measure_algorithm(cls, algorithm):
+    def measure_scaling(cls, algorithm):
         """
-        Measures sorting algorithm characteristics
+        Measures how number of comparisons grows with size of data
         :param algorithm: sorting function
-        :return: Dataframe containing performance characteristics
+        :return: Dictionary containing growth exponent and constant for every distribution
+        """
+        curves = {distribution: [] for distribution in cls.scaling_distributions}
+        active = list(cls.scaling_distributions)
+        spent = 0
+        for size in cls.scaling_sizes:
+            for distribution in list(active):
+                curve = curves[distribution]
+                # Two smallest sizes are always measured, others only if expected comparisons fit the budget
+                if len(curve) >= 2:
+                    previous_size, previous_comparisons = curve[-1]
+                    expected = previous_comparisons * (size / previous_size) ** cls.local_exponent(curve)
+                    if spent + expected > cls.scaling_budget:
+                        active.remove(distribution)
+                        continue
+
+                comparisons = cls.count_comparisons(algorithm, cls.distribution_template(distribution, size))
+                spent += comparisons
+                curve.append((size, comparisons))
+                if len(curve) >= 3 and cls.local_exponent(curve) >= cls.quadratic_exponent:
+                    active.remove(distribution)
+
+        characteristics = {}
+        for distribution, curve in curves.items():
+            exponent, constant = cls.fit_growth(curve)
+            characteristics[f'Growth exponent on {distribution} data'] = exponent
+            characteristics[f'Growth constant on {distribution} data'] = constant
+        return characteristics
+
+    @classmethod
+    def check_stability(cls, sorting_algorithm):
+        """
+        Checks if sorting algorithm is stable
+        :param sorting_algorithm:
+        :return: Bool value. True if algorithm is stable, False otherwise
         """
-        collected_data = pd.DataFrame()
+        return cls.run_algorithm(sorting_algorithm, cls.stable_check_data).is_stable
 
-        collected_data['Comparisons on sorted data'] = [PerformanceAnalyser.count_comparisons(algorithm,
-                                                                                              cls.ordered_data)]
-        collected_data['Comparisons on reversed data'] = PerformanceAnalyser.count_comparisons(algorithm,
-                                                                                               cls.ordered_data[::-1])
-        collected_data['Comparisons on shuffled data'] = PerformanceAnalyser.count_comparisons(algorithm,
-                                                                                               cls.shuffled_data)
-        collected_data['Comparisons on nearly sorted data'] = PerformanceAnalyser. \
-            count_comparisons(algorithm, cls.nearly_sorted_data)
-        collected_data['is_stable'] = PerformanceAnalyser.check_stability(algorithm)
+    # Methods measuring optional feature groups in their own runs.
+    # 'movement' and 'recursion' groups are measured in the same runs as default characteristics
+    group_measurements = {
+        'scaling': 'measure_scaling',
+        'distributions': 'measure_distributions',
+        'profiling': 'measure_profiling',
+    }
+
+    @classmethod
+    def measure_algorithm(cls, algorithm, groups=()):
+        """
+        Measures sorting algorithm characteristics
+        :param algorithm: sorting function
+        :param groups: names of optional feature groups to measure in addition to default characteristics
+        :return: Dictionary containing performance characteristics
+        """
+        # Data movement on shuffled data and call depth are measured in the same runs as comparisons
+        runs = {}
+        tracers = {}
+        for name, template in cls.comparison_data():
+            container = InstrumentedList if name == 'shuffled' and 'movement' in groups else list
+            tracers[name] = CallProfiler() if 'recursion' in groups else None
+            runs[name] = cls.run_algorithm(algorithm, template, container, tracers[name])
 
-        return collected_data
+        characteristics = {f'Comparisons on {name} data': run.counter.total for name, run in runs.items()}
+        characteristics['is_stable'] = cls.check_stability(algorithm)
+        if 'movement' in groups:
+            characteristics.update(cls.movement_characteristics(runs['shuffled'].data.counter))
+        if 'recursion' in groups:
+            characteristics.update({f'Call depth on {name} data': tracer.max_depth for name, tracer in tracers.items()})
+        for group in groups:
+            if group in cls.group_measurements:
+                characteristics.update(getattr(cls, cls.group_measurements[group])(algorithm))
+        return characteristics
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import numpy as np
+
+from classes.characteristics import make_extractor
+from classes.compact_forest import CompactForest
+from classes.extraction import ParallelExtractor
+from classes.feature_cache import cache_namespace
+from classes.features import groups_of_columns, to_frame
+
+
+class Predictor:
+    """
+    Keeps trained classifier in memory and predicts sorting algorithms of source files
+    """
+    def __init__(self, classifier_path, threshold, timeout=None, memory_limit=None, cache=None, workers=1,
+                 cpu_limit=None, max_jobs_per_worker=None):
+        """
+        @param classifier_path: path to directory with trained classifier
+        @param threshold: minimal probability of predicted algorithm. Algorithm is unknown otherwise
+        @param timeout: time limit for characteristics extraction in seconds
+        @param memory_limit: memory limit for characteristics extraction in bytes
+        @param cache: FeatureCache for reusing characteristics of already seen source code
+        @param workers: number of parallel extraction processes for batch predictions
+        @param cpu_limit: CPU time limit for characteristics extraction in seconds
+        @param max_jobs_per_worker: number of source files after which extraction process is restarted
+        """
+        self.classifier_path = Path(classifier_path).resolve()
+        self.model = CompactForest.load(self.classifier_path / 'forest')
+        self.threshold = threshold
+        self.cache = cache
+        # Optional characteristics are extracted only if classifier was trained on them
+        self.groups = groups_of_columns(self.model.feature_names)
+        self.extractor = ParallelExtractor(make_extractor(self.groups), workers, timeout, memory_limit, cpu_limit,
+                                           max_jobs_per_worker)
+
+    def close(self):
+        """
+        Stops extraction processes
+        """
+        self.extractor.close()
+
+    def predict(self, path):
+        """
+        Predicts sorting algorithm implemented in given source file
+        @param path: path to source code
+        @return: Dictionary with path, status, label, confidence, probabilities and message keys.
+        Label is None if algorithm is unknown or characteristics weren't extracted
+        """
+        return self.predict_batch([path])[0]
+
+    def predict_batch(self, paths):
+        """
+        Predicts sorting algorithms of many source files.
+        Characteristics are extracted in parallel and classified with a single predict_proba call
+        @param paths: paths to source code
+        @return: List of prediction dictionaries (see predict) in order of given paths
+        """
+        paths = [Path(path) for path in paths]
+        results = {result.path: result for result in self.extractor.imap(paths, self.cache,
+                                                                                cache_namespace(self.groups))}
+
+        predictions = [{'path': str(path), 'status': results[path].status, 'label': None, 'confidence': None,
+                        'probabilities': None, 'message': results[path].message} for path in paths]
+        extracted = [i for i, path in enumerate(paths) if results[path].ok]
+        if not extracted:
+            return predictions
+
+        probabilities = self.model.predict_proba(to_frame([results[paths[i]].characteristics for i in extracted],
+                                                          self.model.feature_names))
+        confidences = np.max(probabilities, axis=1)
+        labels = self.model.classes_[np.argmax(probabilities, axis=1)]
+        classes = [str(label) for label in self.model.classes_]
+        for i, row_probabilities, confidence, label in zip(extracted, probabilities, confidences, labels):
+            prediction = predictions[i]
+            prediction['probabilities'] = dict(zip(classes, row_probabilities.tolist()))
+            prediction['confidence'] = float(confidence)
+            if confidence > self.threshold:
+                prediction['label'] = str(label)
+        return predictions
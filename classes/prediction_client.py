@@ -0,0 +1,60 @@
+import json
+import socket
+
+
+def request_prediction(socket_path, path, classifier=None):
+    """
+    Asks running prediction server to classify source file
+    @param socket_path: path to Unix socket of prediction server
+    @param path: path to source code
+    @param classifier: path to classifier that must be used. Server with another classifier answers
+    with wrong_classifier status. Any classifier is accepted if None
+    @return: Dictionary returned by Predictor.predict with classifier key
+    """
+    request = {'path': str(path)}
+    if classifier is not None:
+        request['classifier'] = str(classifier)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(str(socket_path))
+        with connection.makefile('rwb') as stream:
+            stream.write((json.dumps(request) + '\n').encode())
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+def format_prediction(prediction):
+    """
+    @param prediction: dictionary returned by Predictor.predict
+    @return: Human-readable prediction
+    """
+    status = prediction['status']
+    if status == 'incorrect':
+        # Handle incorrect algorithm
+        return f'Sorting algorithm is not correct\n{prediction["message"]}'
+    if status == 'no_sort':
+        # Handle missing sort function
+        return 'Sorting algorithm is missing sort function'
+    if status == 'too_slow':
+        return f'Sorting algorithm is too slow\n{prediction["message"]}'
+    if status == 'timeout':
+        return 'Sorting algorithm exceeded time limit'
+    if status == 'memory':
+        return 'Sorting algorithm exceeded memory limit'
+    if status == 'cpu_limit':
+        return 'Sorting algorithm exceeded CPU time limit'
+    if status == 'busy':
+        return 'Prediction server is busy, try again later or pass --classifier to predict locally'
+    if status == 'server_error':
+        return f'Prediction server failed\n{prediction["message"]}'
+    if status == 'crashed':
+        return f'Sorting algorithm crashed\n{prediction["message"]}'
+    if status != 'ok':
+        # Handle error in provided source code
+        return f'Sorting algorithm raised an exception\n{prediction["message"]}'
+
+    if prediction['label'] is not None:
+        return f"{prediction['label']} - {round(prediction['confidence'] * 100, 2)}%"
+    lines = ["Unknown algorithm"]
+    for label, value in prediction['probabilities'].items():
+        lines.append(f"{label} - {round(value * 100, 2)}%")
+    return '\n'.join(lines)
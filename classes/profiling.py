@@ -0,0 +1,84 @@
+import sys
+import time
+import tracemalloc
+
+from classes import element, instrumented_list, large_stack
+
+# Calls of measurement code are not counted as calls made by sorting algorithm
+EXCLUDED_FILES = frozenset([element.__file__, instrumented_list.__file__, large_stack.__file__, __file__])
+
+
+class Timer:
+    """
+    Measures wall-clock time of code inside with block in nanoseconds
+    """
+    def __init__(self):
+        self.elapsed = None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.elapsed = time.perf_counter_ns() - self._start
+
+
+class MemoryProbe:
+    """
+    Measures peak memory allocated by code inside with block in bytes
+    """
+    def __init__(self):
+        self.peak = None
+        self._started = False
+        self._baseline = 0
+
+    def __enter__(self):
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.peak = max(0, tracemalloc.get_traced_memory()[1] - self._baseline)
+        if self._started:
+            tracemalloc.stop()
+
+
+class CallProfiler:
+    """
+    Counts calls of Python functions made by code inside with block, per function,
+    and traces maximal depth of nested calls. Works for the thread it was entered in
+    """
+    def __init__(self):
+        self.calls = {}
+        self.depth = 0
+        self.max_depth = 0
+
+    def _profile(self, frame, event, arg):
+        if event == 'call':
+            code = frame.f_code
+            if code.co_filename not in EXCLUDED_FILES:
+                name = getattr(code, 'co_qualname', code.co_name)
+                self.calls[name] = self.calls.get(name, 0) + 1
+                self.depth += 1
+                if self.depth > self.max_depth:
+                    self.max_depth = self.depth
+        elif event == 'return':
+            # Return event comes for frames left by exception too
+            if frame.f_code.co_filename not in EXCLUDED_FILES:
+                self.depth -= 1
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+    def __enter__(self):
+        self._previous = sys.getprofile()
+        sys.setprofile(self._profile)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        sys.setprofile(self._previous)
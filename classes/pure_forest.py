@@ -0,0 +1,133 @@
+import ast
+import base64
+import io
+import json
+import math
+import struct
+import zipfile
+from pathlib import Path
+
+NODE_FORMAT = struct.Struct('<iiid')
+FORMAT_VERSION = 1
+
+
+def _read_npy(stream):
+    """
+    Reads array saved by numpy.save without numpy
+    @param stream: binary stream positioned at the beginning of .npy data
+    @return: Tuple (header, raw data). Header is dictionary with descr, fortran_order and shape keys
+    """
+    if stream.read(6) != b'\x93NUMPY':
+        raise ValueError('Not a .npy file')
+    major, _ = stream.read(2)
+    length_format = '<H' if major == 1 else '<I'
+    header_length = struct.unpack(length_format, stream.read(struct.calcsize(length_format)))[0]
+    header = ast.literal_eval(stream.read(header_length).decode('latin1'))
+    if header['fortran_order']:
+        raise ValueError('Fortran ordered arrays are not supported')
+    return header, stream.read()
+
+
+def _to_float32(value):
+    """
+    Rounds number to single precision, same as numpy conversion to float32
+    """
+    try:
+        return struct.unpack('<f', struct.pack('<f', value))[0]
+    except OverflowError:
+        return math.copysign(math.inf, value)
+
+
+class PureForest:
+    """
+    Inference engine for forest exported by CompactForest written in plain Python.
+    Doesn't need numpy or sklearn, so it can be used where their import is too slow or unavailable
+    """
+    def __init__(self, nodes, values, roots, classes, feature_names):
+        """
+        @param nodes: list of (left, right, feature, threshold) tuples
+        @param values: list of class probability lists, one per node
+        @param roots: list of root node indices, one per tree
+        @param classes: class labels in order of values
+        @param feature_names: names of features in order expected by trees
+        """
+        self.nodes = nodes
+        self.values = values
+        self.roots = roots
+        self.classes_ = list(classes)
+        self.feature_names = list(feature_names)
+
+    @classmethod
+    def _from_arrays(cls, meta, nodes, values):
+        if meta['format_version'] != FORMAT_VERSION:
+            raise ValueError(f'Unsupported forest format version {meta["format_version"]}')
+        nodes_header, nodes_data = nodes
+        values_header, values_data = values
+        if nodes_header['descr'] != [('left', '<i4'), ('right', '<i4'), ('feature', '<i4'), ('threshold', '<f8')] \
+                or values_header['descr'] != '<f8':
+            raise ValueError('Unexpected forest arrays layout')
+
+        flat_values = struct.unpack(f'<{len(values_data) // 8}d', values_data)
+        n_classes = values_header['shape'][1]
+        return cls(list(NODE_FORMAT.iter_unpack(nodes_data)),
+                   [flat_values[i:i + n_classes] for i in range(0, len(flat_values), n_classes)],
+                   meta['roots'], meta['classes'], meta['feature_names'])
+
+    @classmethod
+    def load(cls, directory):
+        """
+        @param directory: directory created by CompactForest.save
+        @return: PureForest
+        """
+        directory = Path(directory)
+        with open(directory / 'meta.json') as meta_file:
+            meta = json.load(meta_file)
+        with open(directory / 'nodes.npy', 'rb') as nodes_file, open(directory / 'values.npy', 'rb') as values_file:
+            return cls._from_arrays(meta, _read_npy(nodes_file), _read_npy(values_file))
+
+    @classmethod
+    def loads(cls, string):
+        """
+        @param string: string created by CompactForest.dumps
+        @return: PureForest
+        """
+        with zipfile.ZipFile(io.BytesIO(base64.b64decode(string))) as archive:
+            arrays = {}
+            for name in ('nodes', 'values', 'meta'):
+                with archive.open(f'{name}.npy') as stream:
+                    arrays[name] = _read_npy(stream)
+        return cls._from_arrays(json.loads(arrays['meta'][1]), arrays['nodes'], arrays['values'])
+
+    def _to_rows(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names].to_dict('records')
+        for row in X:
+            if isinstance(row, dict):
+                row = [row[name] for name in self.feature_names]
+            # Trees compare features in single precision, same as sklearn
+            yield [_to_float32(float(value)) for value in row]
+
+    def predict_proba(self, X):
+        """
+        Result is identical to RandomForestClassifier.predict_proba
+        @param X: dataframe with feature_names columns, list of characteristics dictionaries
+        or list of rows with features in feature_names order
+        @return: List of class probability lists, one per sample
+        """
+        nodes, values = self.nodes, self.values
+        n_classes = len(self.classes_)
+        n_trees = len(self.roots)
+
+        probabilities = []
+        for row in self._to_rows(X):
+            proba = [0.0] * n_classes
+            for node in self.roots:
+                left, right, feature, threshold = nodes[node]
+                while left != -1:
+                    node = left if row[feature] <= threshold else right
+                    left, right, feature, threshold = nodes[node]
+                # Trees are summed one by one in the same order as sklearn to get bitwise equal result
+                for k, value in enumerate(values[node]):
+                    proba[k] += value
+            probabilities.append([value / n_trees for value in proba])
+        return probabilities
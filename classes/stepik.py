@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+# Responses worth retrying: rate limit and temporary server failures
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class RateLimiter:
+    """
+    Spaces out requests of all threads so no more than given number of them start per second
+    """
+    def __init__(self, rate):
+        """
+        @param rate: requests per second. Unlimited if None
+        """
+        self.interval = 1 / rate if rate else 0
+        self._next_time = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class StepikClient:
+    """
+    Client of Stepik API with client credentials authorization. Every thread keeps its own persistent session,
+    token is shared and refreshed when it expires or is rejected. Failed requests are retried with exponential backoff
+    """
+    def __init__(self, client_id, client_secret, base_url='https://stepik.org', rate=None, retries=5, backoff=1.0,
+                 timeout=30):
+        """
+        @param client_id: Client id of Stepik application
+        @param client_secret: Client secret of Stepik application
+        @param base_url: Stepik address, replaced by address of a fake server in tests
+        @param rate: requests per second of all threads together. Unlimited if None
+        @param retries: number of retries of a failed request
+        @param backoff: delay before the first retry in seconds, doubled for every next retry
+        @param timeout: timeout of a single request in seconds
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip('/')
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._local = threading.local()
+        self._token = None
+        self._token_expires = 0
+        self._token_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _request(self, method, url, **kwargs):
+        """
+        Sends request, retrying connection errors and responses with RETRY_STATUSES
+        @return: Response with status not in RETRY_STATUSES
+        """
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                delay = None
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                delay = response.headers.get('Retry-After')
+            # Server asks for a specific delay on rate limiting, otherwise exponential backoff with jitter
+            if delay is not None and delay.isdigit():
+                time.sleep(int(delay))
+            else:
+                time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def token(self, refresh=False):
+        """
+        @param refresh: get a new token even if current one hasn't expired
+        @return: Access token
+        """
+        with self._token_lock:
+            if refresh or self._token is None or time.monotonic() >= self._token_expires:
+                response = self._request('POST', f'{self.base_url}/oauth2/token/',
+                                         data={'grant_type': 'client_credentials'},
+                                         auth=requests.auth.HTTPBasicAuth(self.client_id, self.client_secret))
+                # Stepik rejects wrong client id or secret with 400 or 401
+                if response.status_code in (400, 401):
+                    raise PermissionError('Unable to authorize with provided credentials')
+                response.raise_for_status()
+                reply = response.json()
+                if not reply.get('access_token'):
+                    raise PermissionError('Unable to authorize with provided credentials')
+                self._token = reply['access_token']
+                # Token is renewed a minute before it expires
+                self._token_expires = time.monotonic() + reply.get('expires_in', 36000) - 60
+            return self._token
+
+    def get(self, path, params=None):
+        """
+        @param path: API path, e.g. /api/submissions
+        @param params: query parameters
+        @return: Decoded JSON reply
+        """
+        token = self.token()
+        response = self._request('GET', f'{self.base_url}{path}', params=params,
+                                 headers={'Authorization': f'Bearer {token}'})
+        if response.status_code == 401:
+            response = self._request('GET', f'{self.base_url}{path}', params=params,
+                                     headers={'Authorization': f'Bearer {self.token(refresh=True)}'})
+        response.raise_for_status()
+        return response.json()
+
+
+def code_hash(code):
+    """
+    @param code: source code
+    @return: Hex digest of code ignoring trailing whitespace of lines and file
+    """
+    normalized = '\n'.join(line.rstrip() for line in code.strip().splitlines())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class SubmissionDownloader:
+    """
+    Downloads correct Python solutions of many Stepik steps in parallel. Every step is saved to its own directory.
+    Number of the next page of every step is stored in a state file, so interrupted download continues
+    where it stopped. Solutions with the same code within a step are saved once
+    """
+    state_file = '.stepik_state.json'
+
+    def __init__(self, client, data_directory, language='python3'):
+        """
+        @param client: StepikClient
+        @param data_directory: directory where code solutions are saved
+        @param language: language of saved solutions
+        """
+        self.client = client
+        self.data_directory = Path(data_directory)
+        self.language = language
+        self._state_lock = threading.Lock()
+        self.data_directory.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(self.data_directory / self.state_file) as state:
+                self.state = json.load(state)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def _save_state(self, step_id, cursor):
+        with self._state_lock:
+            self.state[str(step_id)] = cursor
+            path = self.data_directory / self.state_file
+            temporary_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temporary_path, 'w') as state:
+                json.dump(self.state, state)
+            os.replace(temporary_path, path)
+
+    def load_step(self, step_id, restart=False):
+        """
+        Loads all remaining pages of step
+        @param step_id: step id
+        @param restart: load step from the first page even if it was loaded before, to get new solutions.
+        Already saved solutions aren't saved again
+        @return: Number of saved solutions
+        """
+        cursor = self.state.get(str(step_id), {'page': 1, 'done': False})
+        if restart:
+            cursor = {'page': 1, 'done': False}
+        if cursor['done']:
+            return 0
+
+        step_directory = self.data_directory / str(step_id)
+        hashes = {code_hash(path.read_text()) for path in step_directory.glob('*.py')} \
+            if step_directory.exists() else set()
+        saved = 0
+        while True:
+            reply = self.client.get('/api/submissions',
+                                    params={'step': step_id, 'status': 'correct', 'page': cursor['page']})
+            for submission in reply['submissions']:
+                code = submission['reply'].get('code', None)
+                language = submission['reply'].get('language', None)
+                if code is None or language != self.language or code_hash(code) in hashes:
+                    continue
+                hashes.add(code_hash(code))
+                step_directory.mkdir(exist_ok=True)
+                with open(step_directory / f'{submission["id"]}.py', 'w') as file:
+                    file.write(code)
+                saved += 1
+
+            has_next = reply['meta']['has_next']
+            cursor = {'page': cursor['page'] + 1 if has_next else cursor['page'], 'done': not has_next}
+            self._save_state(step_id, cursor)
+            if not has_next:
+                return saved
+
+    def load(self, step_ids, workers=4, restart=False):
+        """
+        @param step_ids: ids of steps
+        @param workers: number of steps loaded simultaneously
+        @param restart: load steps from the first page, see load_step
+        @return: Dictionary of numbers of saved solutions by step ids
+        """
+        with ThreadPoolExecutor(workers) as executor:
+            return dict(zip(step_ids, executor.map(lambda step_id: self.load_step(step_id, restart), step_ids)))
@@ -0,0 +1,50 @@
+import glob
+import tarfile
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+
+
+def _is_safe_member(name):
+    path = PurePosixPath(name)
+    return not path.is_absolute() and '..' not in path.parts
+
+
+def _extract_archive(archive_path, directory):
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            archive.extractall(directory, [name for name in archive.namelist()
+                                           if name.endswith('.py') and _is_safe_member(name)])
+    else:
+        with tarfile.open(archive_path) as archive:
+            archive.extractall(directory, [member for member in archive.getmembers()
+                                           if member.isfile() and member.name.endswith('.py')
+                                           and _is_safe_member(member.name)])
+
+
+def is_archive(path):
+    path = Path(path)
+    return path.is_file() and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+
+@contextmanager
+def open_submissions(source):
+    """
+    Resolves source files of submissions. Archives are unpacked into temporary directory
+    which is removed on exit
+    @param source: path to source file, directory, zip or tar archive, or glob pattern
+    @return: Tuple (root, paths). Root is given directory or directory with unpacked archive, None otherwise.
+    Paths are sorted paths to source files
+    """
+    path = Path(source)
+    if path.is_dir():
+        yield path, sorted(path.rglob('*.py'))
+    elif is_archive(path):
+        with tempfile.TemporaryDirectory() as directory:
+            _extract_archive(path, directory)
+            yield Path(directory), sorted(Path(directory).rglob('*.py'))
+    elif path.is_file():
+        yield None, [path]
+    else:
+        yield None, sorted(Path(match) for match in glob.glob(str(source), recursive=True) if match.endswith('.py'))
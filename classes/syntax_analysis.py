@@ -1,83 +1,147 @@
 import ast
 
-import pandas as pd
+
+class SyntaxFeature:
+    """
+    Base class for syntax characteristics collected during the single AST traversal.
+    Subclasses list node classes they are interested in and receive them in depth-first order
+    """
+    node_types = ()
+
+    def visit(self, node):
+        """
+        Processes node of one of node_types
+        @param node: AST node
+        """
+        raise NotImplementedError
+
+    def result(self):
+        """
+        @return: Dictionary of syntax characteristics
+        """
+        raise NotImplementedError
 
 
 class SyntaxAnalyser:
     """
     Class for syntax analysis of sorting algorithms
     """
-    class RecursiveFunctionsFinder(ast.NodeVisitor):
+    features = []
+
+    @classmethod
+    def register_feature(cls, feature_class):
         """
-        AST node visitor for finding recursive functions
+        Adds syntax feature to the analysis. Can be used as class decorator
+        @param feature_class: subclass of SyntaxFeature
+        @return: Registered class
         """
-        def __init__(self):
-            self._current_func = None
-            self.recursive_funcs = set()
-
-        def generic_visit(self, node):
-            if node.__class__ is ast.FunctionDef:
-                self._current_func = node.name
-            if node.__class__ is ast.Call and hasattr(node.func, 'id') and node.func.id == self._current_func:
-                self.recursive_funcs.add(self._current_func)
-            super(self.__class__, self).generic_visit(node)
+        cls.features.append(feature_class)
+        return feature_class
 
-    class CycleCounter(ast.NodeVisitor):
+    @staticmethod
+    def traverse(tree, collectors):
         """
-        Class for counting cycles in code
+        Walks AST once in depth-first order and passes nodes to interested collectors
+        @param tree: AST
+        @param collectors: SyntaxFeature instances
         """
-        def __init__(self):
-            self.cycles = 0
-            self.nested_cycles = 0
-
-        def generic_visit(self, node):
-            # Iterate over For and While elements
-            if (node.__class__ is ast.For) or (node.__class__ is ast.While):
-                self.cycles += 1
+        handlers = {}
+        for collector in collectors:
+            for node_type in collector.node_types:
+                handlers.setdefault(node_type, []).append(collector.visit)
 
-                # Count nested cycles inside current cycle
-                for inner_node in node.body:
-                    if (inner_node.__class__ is ast.For) or (inner_node.__class__ is ast.While):
-                        self.nested_cycles += 1
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            for handler in handlers.get(node.__class__, ()):
+                handler(node)
+            stack.extend(reversed(list(ast.iter_child_nodes(node))))
 
-            super(self.__class__, self).generic_visit(node)
+    @staticmethod
+    def parse(code):
+        """
+        @param code: Python code string or already parsed AST
+        @return: AST
+        """
+        return code if isinstance(code, ast.AST) else ast.parse(code)
 
     @staticmethod
     def get_recursive_functions(code):
         """
         Get all recursive functions from code
-        :param code: Python code string
+        :param code: Python code string or AST
         :return: Set of function names that are recursive
         """
-        tree = ast.parse(code)
-        finder = SyntaxAnalyser.RecursiveFunctionsFinder()
-        finder.visit(tree)
+        finder = RecursiveFunctionsFinder()
+        SyntaxAnalyser.traverse(SyntaxAnalyser.parse(code), [finder])
         return finder.recursive_funcs
 
     @staticmethod
     def count_cycles(code):
         """
         Count all for and while cycles in code
-        @param code: Python code string
+        @param code: Python code string or AST
         @return: Tuple (number_of_cycles, number_of_inner_cycles)
         """
-        tree = ast.parse(code)
-        cycle_counter = SyntaxAnalyser.CycleCounter()
-        cycle_counter.visit(tree)
+        cycle_counter = CycleCounter()
+        SyntaxAnalyser.traverse(SyntaxAnalyser.parse(code), [cycle_counter])
         return cycle_counter.cycles, cycle_counter.nested_cycles
 
-    @staticmethod
-    def analyze(code):
+    @classmethod
+    def analyze(cls, code):
         """
-        Extract syntax characteristics from Python code string
-        @param code: Python code string
-        @return: Dataframe containing syntax characteristics
+        Extract syntax characteristics from Python code string in a single pass over its AST
+        @param code: Python code string or AST
+        @return: Dictionary containing syntax characteristics
         """
-        syntax_characteristics = pd.DataFrame()
-
-        syntax_characteristics['is_recursive'] = [len(SyntaxAnalyser.get_recursive_functions(code)) != 0]
-        cycles, nested_cycles = SyntaxAnalyser.count_cycles(code)
-        syntax_characteristics['number_of_cycles'] = [cycles]
-        syntax_characteristics['number_of_nested_cycles'] = [nested_cycles]
+        collectors = [feature_class() for feature_class in cls.features]
+        cls.traverse(cls.parse(code), collectors)
 
+        syntax_characteristics = {}
+        for collector in collectors:
+            syntax_characteristics.update(collector.result())
         return syntax_characteristics
+
+
+@SyntaxAnalyser.register_feature
+class RecursiveFunctionsFinder(SyntaxFeature):
+    """
+    Finds recursive functions
+    """
+    node_types = (ast.FunctionDef, ast.Call)
+
+    def __init__(self):
+        self._current_func = None
+        self.recursive_funcs = set()
+
+    def visit(self, node):
+        if node.__class__ is ast.FunctionDef:
+            self._current_func = node.name
+        elif hasattr(node.func, 'id') and node.func.id == self._current_func:
+            self.recursive_funcs.add(self._current_func)
+
+    def result(self):
+        return {'is_recursive': len(self.recursive_funcs) != 0}
+
+
+@SyntaxAnalyser.register_feature
+class CycleCounter(SyntaxFeature):
+    """
+    Counts for and while cycles
+    """
+    node_types = (ast.For, ast.While)
+
+    def __init__(self):
+        self.cycles = 0
+        self.nested_cycles = 0
+
+    def visit(self, node):
+        self.cycles += 1
+
+        # Count nested cycles inside current cycle
+        for inner_node in node.body:
+            if (inner_node.__class__ is ast.For) or (inner_node.__class__ is ast.While):
+                self.nested_cycles += 1
+
+    def result(self):
+        return {'number_of_cycles': self.cycles, 'number_of_nested_cycles': self.nested_cycles}
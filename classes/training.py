@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterGrid, RepeatedKFold, StratifiedKFold
+
+
+def dataset_fingerprint(features, targets):
+    """
+    @param features: dataframe of characteristics
+    @param targets: array of encoded labels
+    @return: Hex digest identifying dataset. Checkpoints of different datasets don't mix
+    """
+    fingerprint = hashlib.sha256()
+    fingerprint.update(json.dumps(list(features.columns)).encode())
+    fingerprint.update(np.ascontiguousarray(features.to_numpy(dtype=np.float64)).tobytes())
+    fingerprint.update(np.ascontiguousarray(targets, dtype=np.int64).tobytes())
+    return fingerprint.hexdigest()
+
+
+class CheckpointStore:
+    """
+    Directory of per-fold results. Every evaluated fold is written to its own JSON file,
+    so an interrupted training resumes from the folds that weren't finished
+    """
+    def __init__(self, path, fingerprint):
+        """
+        @param path: checkpoint directory. Checkpointing is disabled if None
+        @param fingerprint: dataset fingerprint
+        """
+        self.directory = Path(path) / fingerprint if path is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _key(stage, params, fold):
+        params_hash = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+        return f'{stage}-{params_hash}-{fold}.json'
+
+    def load(self, stage, params, fold):
+        """
+        @return: Stored fold result or None
+        """
+        if self.directory is None:
+            return None
+        try:
+            with open(self.directory / self._key(stage, params, fold)) as checkpoint:
+                return json.load(checkpoint)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, stage, params, fold, result):
+        if self.directory is None:
+            return
+        path = self.directory / self._key(stage, params, fold)
+        # Written under temporary name and renamed, so a crash never leaves half-written checkpoint
+        temporary_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temporary_path, 'w') as checkpoint:
+            json.dump(result, checkpoint)
+        os.replace(temporary_path, path)
+
+    def remove(self):
+        """
+        Deletes results of the dataset once training finished, they are only needed to resume it
+        """
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _evaluate_fold(params, features, targets, train, test, random_state, store, stage, fold):
+    start = time.monotonic()
+    clf = RandomForestClassifier(**params, random_state=random_state)
+    clf.fit(features.iloc[train], targets[train])
+    result = {'params': params, 'fold': fold, 'score': float(clf.score(features.iloc[test], targets[test])),
+              'fit_time': time.monotonic() - start}
+    store.save(stage, params, fold, result)
+    return result
+
+
+def evaluate(candidates, features, targets, splits, store, stage, n_jobs=-1, random_state=0):
+    """
+    Scores candidates on every fold in parallel. Folds found in checkpoint store are not fitted again
+    @param candidates: list of parameter dictionaries of RandomForestClassifier
+    @param features: dataframe of characteristics
+    @param targets: array of encoded labels
+    @param splits: list of (train indices, test indices) pairs
+    @param store: CheckpointStore
+    @param stage: name separating checkpoints of search and validation
+    @param n_jobs: number of parallel jobs, all CPUs if -1
+    @param random_state: seed of every forest
+    @return: List of fold score lists in order of candidates
+    """
+    results = {}
+    tasks = []
+    for i, params in enumerate(candidates):
+        for fold, (train, test) in enumerate(splits):
+            stored = store.load(stage, params, fold)
+            if stored is not None:
+                results[i, fold] = stored
+            else:
+                tasks.append((i, fold, delayed(_evaluate_fold)(params, features, targets, train, test, random_state,
+                                                               store, stage, fold)))
+    if tasks:
+        computed = Parallel(n_jobs=n_jobs)(task for _, _, task in tasks)
+        for (i, fold, _), result in zip(tasks, computed):
+            results[i, fold] = result
+    return [[results[i, fold]['score'] for fold in range(len(splits))] for i in range(len(candidates))]
+
+
+def search(features, targets, space, store, n_jobs=-1, budget=None, random_state=0, n_splits=5):
+    """
+    Cross-validated search over parameter grid. Candidates are visited in random order with fixed seed
+    and evaluated in batches, no new batch is started after the wall-clock budget is spent
+    @param features: dataframe of characteristics
+    @param targets: array of encoded labels
+    @param space: dictionary of parameter lists
+    @param store: CheckpointStore
+    @param n_jobs: number of parallel jobs, all CPUs if -1
+    @param budget: wall-clock budget in seconds. Unlimited if None
+    @param random_state: seed of candidate order, folds and forests
+    @param n_splits: number of folds
+    @return: Tuple (best parameters, list of (parameters, mean score) pairs of evaluated candidates)
+    """
+    deadline = time.monotonic() + budget if budget is not None else None
+    candidates = list(ParameterGrid(space))
+    order = np.random.default_rng(random_state).permutation(len(candidates))
+    candidates = [candidates[i] for i in order]
+    splits = list(StratifiedKFold(n_splits, shuffle=True, random_state=random_state).split(features, targets))
+
+    # Every batch gives at least two folds to every job
+    batch_size = max(1, -(-2 * _effective_jobs(n_jobs) // n_splits))
+    evaluated = []
+    for start in range(0, len(candidates), batch_size):
+        if deadline is not None and evaluated and time.monotonic() >= deadline:
+            break
+        batch = candidates[start:start + batch_size]
+        scores = evaluate(batch, features, targets, splits, store, 'search', n_jobs, random_state)
+        evaluated.extend((params, float(np.mean(fold_scores))) for params, fold_scores in zip(batch, scores))
+
+    best_params, _ = max(evaluated, key=lambda candidate: candidate[1])
+    return best_params, evaluated
+
+
+def validate(params, features, targets, store, n_jobs=-1, random_state=0, n_splits=10, n_repeats=20):
+    """
+    Repeated k-fold validation of chosen parameters
+    @return: Array of fold scores
+    """
+    splits = list(RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state).split(features))
+    return np.array(evaluate([params], features, targets, splits, store, 'validation', n_jobs, random_state)[0])
+
+
+def _effective_jobs(n_jobs):
+    if n_jobs is None or n_jobs < 0:
+        return os.cpu_count() or 1
+    return n_jobs
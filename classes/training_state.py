@@ -0,0 +1,89 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from classes.feature_cache import CACHEABLE_STATUSES, source_hash
+from classes.feature_dataset import FeatureDataset
+
+
+class TrainingState:
+    """
+    Manifest of source files the last classifier was trained on and FeatureDataset of their characteristics.
+    Allows extracting characteristics only for new and changed files on the next training
+    """
+    def __init__(self, directory, version, groups):
+        """
+        @param directory: directory of the state. Created if missing
+        @param version: extractor version. State of a different version is discarded
+        @param groups: names of optional feature groups. State with different groups is discarded
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.version = version
+        self.groups = list(groups)
+
+        self.dataset = FeatureDataset.from_results([], {}, self.directory, version, groups)
+        manifest = self._load_manifest()
+        if manifest is not None and manifest['version'] == version and manifest['groups'] == self.groups \
+                and (self.directory / 'features').exists():
+            try:
+                self.dataset = FeatureDataset.load(self.directory / 'features', mmap_mode=None)
+            except ValueError:
+                # Dataset of an older format is extracted again
+                pass
+
+    def _load_manifest(self):
+        try:
+            with open(self.directory / 'manifest.json') as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+
+    def plan(self, labels, root):
+        """
+        Compares dataset with the manifest. New files, changed files, files with changed label and files
+        that failed because of time or memory limits are extracted again
+        @param labels: dictionary of labels by paths to source code
+        @param root: dataset directory. Paths are stored relative to it
+        @return: Tuple (dictionary of hashes by relative path, list of paths to extract)
+        """
+        table = self.dataset.to_frame()
+        settled = table[table['status'].isin(CACHEABLE_STATUSES)]
+        known = dict(zip(settled['path'], zip(settled['hash'], settled['label'])))
+        hashes = {}
+        changed = []
+        for path, label in labels.items():
+            relative_path = Path(path).relative_to(root).as_posix()
+            hashes[relative_path] = source_hash(Path(path).read_bytes())
+            if known.get(relative_path) != (hashes[relative_path], label):
+                changed.append(path)
+        return hashes, changed
+
+    def update(self, labels, root, hashes, results):
+        """
+        Replaces rows of changed files with new extraction results and drops rows of removed files
+        @param labels: dictionary of labels by paths to source code
+        @param root: dataset directory
+        @param hashes: dictionary of hashes by relative path returned by plan
+        @param results: ExtractionResults of changed files
+        """
+        new_rows = FeatureDataset.from_results(results, labels, root, self.version, self.groups, hashes).to_frame()
+        table = self.dataset.to_frame()
+        kept = table[table['path'].isin(hashes.keys()) & ~table['path'].isin(new_rows['path'])]
+        table = pd.concat([kept, new_rows], ignore_index=True) if len(kept) else new_rows
+        self.dataset = FeatureDataset.from_frame(table.sort_values('path', ignore_index=True), self.groups)
+
+    def save(self):
+        """
+        Writes the dataset first and the manifest last, both are replaced atomically
+        """
+        self.dataset.save(self.directory / 'features')
+
+        manifest_path = self.directory / 'manifest.json'
+        manifest = {'version': self.version, 'groups': self.groups,
+                    'files': dict(zip(self.dataset.columns['path'].tolist(), self.dataset.columns['hash'].tolist()))}
+        with open(manifest_path.with_suffix(f'.{os.getpid()}.tmp'), 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(manifest_path.with_suffix(f'.{os.getpid()}.tmp'), manifest_path)
@@ -0,0 +1,93 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from classes.element import Element
+
+
+class Verification(NamedTuple):
+    """
+    Result of sorted data verification
+    """
+    is_sorted: bool
+    # Sorted data holds exactly the elements of input data
+    is_permutation: bool
+    # None if data has no equal elements or isn't correctly sorted
+    is_stable: Optional[bool]
+
+    @property
+    def ok(self):
+        return self.is_sorted and self.is_permutation
+
+
+def element_arrays(data):
+    """
+    Reads raw keys of Elements without comparing them
+    @param data: list of Elements
+    @return: Tuple (sorting_criteria array, sequential_id array). None if data holds anything except Elements
+    """
+    if any(element.__class__ is not Element for element in data):
+        return None
+    criteria = np.array([element.sorting_criteria for element in data])
+    ids = np.array([element.sequential_id for element in data])
+    return criteria, ids
+
+
+def template_arrays(template):
+    """
+    @param template: tuple of (sorting_criteria, sequential_id) pairs
+    @return: Tuple (sorting_criteria array, sequential_id array)
+    """
+    pairs = np.array(template).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def is_sorted(criteria):
+    """
+    @param criteria: array of sorting criteria
+    @return: True if criteria are in non-decreasing order
+    """
+    return not (criteria[1:] < criteria[:-1]).any()
+
+
+def is_permutation(criteria, ids, expected_criteria, expected_ids):
+    """
+    Checks that (sorting_criteria, sequential_id) pairs form the same multiset as expected ones
+    """
+    if len(criteria) != len(expected_criteria):
+        return False
+    order = np.lexsort((criteria, ids))
+    expected_order = np.lexsort((expected_criteria, expected_ids))
+    return bool(np.array_equal(ids[order], expected_ids[expected_order]) and
+                np.array_equal(criteria[order], expected_criteria[expected_order]))
+
+
+def is_stable(criteria, ids):
+    """
+    Checks that sequential ids of equal neighbours are ascending
+    @param criteria: sorted array of sorting criteria
+    @param ids: array of sequential ids
+    @return: True if stable, False if not, None if there are no equal elements
+    """
+    equal = criteria[1:] == criteria[:-1]
+    if not equal.any():
+        return None
+    return not (equal & (ids[1:] < ids[:-1])).any()
+
+
+def verify(data, template):
+    """
+    Verifies result of sorting algorithm with array operations
+    @param data: list returned to sorting algorithm
+    @param template: tuple of (sorting_criteria, sequential_id) pairs of input data
+    @return: Verification
+    """
+    arrays = element_arrays(data)
+    if arrays is None:
+        return Verification(False, False, None)
+    criteria, ids = arrays
+    if not is_sorted(criteria):
+        return Verification(False, is_permutation(criteria, ids, *template_arrays(template)), None)
+    if not is_permutation(criteria, ids, *template_arrays(template)):
+        return Verification(True, False, None)
+    return Verification(True, True, is_stable(criteria, ids))
@@ -1 +1,48 @@
+from pathlib import Path
+
 PREDICTION_THRESHOLD = 0.70
+
+# Threshold calibration
+CALIBRATION_TARGET_ACCURACY = 0.95  # Required accuracy of predictions above recommended threshold
+CALIBRATION_STEP = 0.005  # Step of threshold grid
+CALIBRATION_BINS = 10  # Confidence bins of reliability diagrams
+
+# Parallel characteristics extraction
+EXTRACTION_WORKERS = None  # Number of CPUs if None
+EXTRACTION_TIMEOUT = 30  # Seconds per source file
+EXTRACTION_MEMORY_LIMIT = 1024 * 1024 * 1024  # Bytes of address space per worker process
+EXTRACTION_CPU_LIMIT = 20  # Seconds of CPU time per source file
+EXTRACTION_MAX_JOBS_PER_WORKER = 100  # Worker processes are restarted after this number of source files
+
+# Optional feature groups extracted for training in addition to default characteristics,
+# e.g. ('movement', 'scaling', 'distributions', 'recursion'). Prediction extracts the groups trained classifier
+# was built with. None are used by default, because moodle_file.py computes only default characteristics.
+# 'profiling' depends on machine, because it measures time and memory
+TRAINING_FEATURE_GROUPS = ()
+
+# Hyperparameter search and validation of random forest
+TRAINING_SEARCH_SPACE = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [3, 5, 7, 9, None],
+    'max_features': ['sqrt', 0.5, None],
+    'min_samples_leaf': [1, 2, 4],
+}
+TRAINING_TIME_BUDGET = 600  # Seconds of wall-clock time for search. No new candidates are started after it
+TRAINING_JOBS = -1  # Parallel fits, all CPUs if -1
+TRAINING_RANDOM_STATE = 0
+TRAINING_CHECKPOINT_PATH = Path(__file__).resolve().parent / 'training_checkpoints'
+TRAINING_EXTRA_TREES = 50  # Trees added to previous forest by incremental training with warm start
+
+# Persistent cache of extracted characteristics
+FEATURE_CACHE_PATH = Path(__file__).resolve().parent / 'feature_cache'
+FEATURE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Downloading solutions from Stepik
+STEPIK_BASE_URL = 'https://stepik.org'
+STEPIK_WORKERS = 4  # Steps downloaded simultaneously
+STEPIK_RATE = 5  # Requests per second of all workers together
+STEPIK_RETRIES = 5  # Retries of a failed request with exponential backoff
+
+# Prediction server
+PREDICTION_SOCKET = Path('/tmp/sorting-algorithm-recognition.sock')
+PREDICTION_CONCURRENCY = 4  # Requests predicted simultaneously, others are answered with busy status
@@ -0,0 +1,2 @@
+def srt(a):
+    pass
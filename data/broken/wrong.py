@@ -0,0 +1,2 @@
+def sort(a):
+    a.reverse()
@@ -0,0 +1,4 @@
+def sort(data):
+    sorted_data = sorted(data)
+    for i in range(len(data)):
+        data[i] = sorted_data[i]
@@ -0,0 +1,9 @@
+def qs(a):
+    if len(a) <= 1:
+        return a
+    p = a[0]
+    return qs([x for x in a[1:] if x < p]) + [p] + qs([x for x in a[1:] if x >= p])
+
+
+def sort(a):
+    a[:] = qs(a)
@@ -1,45 +1,53 @@
 import argparse
-import pickle
-import traceback
 from pathlib import Path
 
-import numpy as np
+from classes.prediction_client import request_prediction, format_prediction
+from config import PREDICTION_THRESHOLD, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, EXTRACTION_CPU_LIMIT, \
+    FEATURE_CACHE_PATH, PREDICTION_SOCKET
+
+
+def predict_locally(args):
+    """
+    Loads classifier in current process. Used when prediction server isn't running
+    """
+    from classes.prediction import Predictor
+    from scripts.train_forest import open_feature_cache
+
+    cache = open_feature_cache(args.cache)
+    predictor = Predictor(args.classifier, PREDICTION_THRESHOLD, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, cache,
+                          cpu_limit=EXTRACTION_CPU_LIMIT)
+    try:
+        return predictor.predict(Path(args.input))
+    finally:
+        predictor.close()
+        if cache is not None:
+            cache.close()
 
-from classes.exceptions import ErrorInSorting, NoSortMethod, IncorrectSorting
-from config import PREDICTION_THRESHOLD
-from scripts.train_forest import get_algorithm_characteristics
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
         description='Predict sorting algorithm from source code')
     parser.add_argument('--input', help='Path file with source code')
-    parser.add_argument('--classifier', help='Path to trained classifier')
+    parser.add_argument('--classifier', help='Path to trained classifier. Prediction server is used only '
+                                             'if it runs with the same classifier')
+    parser.add_argument('--socket', default=PREDICTION_SOCKET, help='Path to Unix socket of prediction server')
+    parser.add_argument('--cache', default=FEATURE_CACHE_PATH, help='Path to feature cache directory')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='Extract characteristics without feature cache')
     args = parser.parse_args()
 
-    with open(Path(args.classifier) / 'forest.txt', 'r') as txt_file:
-        classifier_string = txt_file.read()
-    loaded_model = pickle.loads(eval(classifier_string))
-    # loaded_model = pickle.load(open(Path(args.classifier) / 'forest.clf', 'rb'))
-    label_encoder = pickle.load(open(Path(args.classifier) / 'label_encoder.pkl', 'rb'))
+    classifier = Path(args.classifier).resolve() if args.classifier is not None else None
     try:
-        characteristics = get_algorithm_characteristics(Path(args.input))
-    except IncorrectSorting as e:
-        # Handle incorrect algorithm
-        print(f'Sorting algorithm is not correct')
-        print(e)
-    except NoSortMethod:
-        # Handle missing sort function
-        print(f'Sorting algorithm is missing sort function')
-    except ErrorInSorting as e:
-        # Handle error in provided source code
-        print(f'Sorting algorithm raised an exception')
-        print(e)
-        traceback.print_exc()
+        prediction = request_prediction(args.socket, Path(args.input).resolve(), classifier)
+    except OSError:
+        if args.classifier is None:
+            parser.error('prediction server is not running and --classifier is not provided')
+        prediction = predict_locally(args)
     else:
-        prediction = loaded_model.predict_proba(characteristics)
-        if np.max(prediction[0]) > PREDICTION_THRESHOLD:
-            print(f"{label_encoder.inverse_transform([np.argmax(prediction[0])])[0]} - {round(np.max(prediction[0]) * 100, 2)}%")
-        else:
-            print("Unknown algorithm")
-            for i, val in enumerate(prediction[0]):
-                print(f"{label_encoder.inverse_transform([i])[0]} - {round(val * 100, 2)}%")
+        if prediction['status'] == 'wrong_classifier':
+            # Server was started with another classifier
+            prediction = predict_locally(args)
+        elif prediction['status'] == 'busy' and args.classifier is not None:
+            # Server is occupied by slow submissions of other clients
+            prediction = predict_locally(args)
+    print(format_prediction(prediction))
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+from classes.prediction import Predictor
+from config import PREDICTION_THRESHOLD, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, EXTRACTION_CPU_LIMIT, \
+    EXTRACTION_MAX_JOBS_PER_WORKER, FEATURE_CACHE_PATH, PREDICTION_SOCKET, PREDICTION_CONCURRENCY
+from scripts.train_forest import open_feature_cache
+
+
+def handle_request(predictor, line, slots=None):
+    """
+    @param predictor: Predictor with loaded classifier
+    @param line: JSON request {"path": "<path to source code>", "classifier": "<expected classifier>"}.
+    Classifier is optional, request with another classifier than the loaded one isn't answered
+    @param slots: semaphore limiting simultaneous predictions. Request is answered with busy status
+    if no slot is free. Unlimited if None
+    @return: Response dictionary with path of loaded classifier
+    """
+    classifier = str(predictor.classifier_path)
+    try:
+        request = json.loads(line)
+        path = request['path']
+        expected_classifier = request.get('classifier')
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return {'status': 'bad_request', 'message': f'{type(e).__name__}: {e}', 'classifier': classifier}
+    if expected_classifier is not None and Path(expected_classifier).resolve() != predictor.classifier_path:
+        return {'status': 'wrong_classifier', 'message': f'Server uses classifier {classifier}',
+                'classifier': classifier}
+    if slots is not None and not slots.acquire(blocking=False):
+        # Client predicts locally instead of waiting for slow submissions of other clients
+        return {'path': str(path), 'status': 'busy', 'message': 'All prediction slots are taken',
+                'classifier': classifier}
+    try:
+        return {**predictor.predict(path), 'classifier': classifier}
+    except Exception as e:
+        # A single failed request must not stop the server or drop the connection
+        return {'path': str(path), 'status': 'server_error', 'error': f'{type(e).__name__}: {e}',
+                'message': f'{type(e).__name__}: {e}', 'classifier': classifier}
+    finally:
+        if slots is not None:
+            slots.release()
+
+
+class PredictionHandler(socketserver.StreamRequestHandler):
+    """
+    Answers JSON-lines requests of a single client connection
+    """
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = handle_request(self.server.predictor, line, self.server.slots)
+            self.wfile.write((json.dumps(response) + '\n').encode())
+            self.wfile.flush()
+
+
+class PredictionServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve_socket(predictor, socket_path, concurrency=PREDICTION_CONCURRENCY):
+    """
+    Serves predictions over Unix socket until interrupted.
+    Every connection is handled in its own thread. Extraction processes stay warm between requests
+    @param concurrency: number of simultaneous predictions. Requests above it are answered with busy status
+    """
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with PredictionServer(str(socket_path), PredictionHandler) as server:
+        server.predictor = predictor
+        server.slots = threading.BoundedSemaphore(concurrency)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+def serve_stdio(predictor):
+    """
+    Serves JSON-lines predictions from stdin to stdout until end of input
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        print(json.dumps(handle_request(predictor, line)), flush=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Keep classifier loaded and predict sorting algorithms on request')
+    parser.add_argument('--classifier', help='Path to trained classifier')
+    parser.add_argument('--socket', default=PREDICTION_SOCKET, help='Path to Unix socket for requests')
+    parser.add_argument('--stdio', action='store_true', help='Read JSON-lines requests from stdin instead of socket')
+    parser.add_argument('--cache', default=FEATURE_CACHE_PATH, help='Path to feature cache directory')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='Extract characteristics without feature cache')
+    parser.add_argument('--concurrency', type=int, default=PREDICTION_CONCURRENCY,
+                        help='Number of requests predicted simultaneously over socket')
+    args = parser.parse_args()
+
+    cache = open_feature_cache(args.cache)
+    predictor = Predictor(args.classifier, PREDICTION_THRESHOLD, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, cache,
+                          workers=args.concurrency, cpu_limit=EXTRACTION_CPU_LIMIT, max_jobs_per_worker=EXTRACTION_MAX_JOBS_PER_WORKER)
+    try:
+        if args.stdio:
+            serve_stdio(predictor)
+        else:
+            serve_socket(predictor, args.socket, args.concurrency)
+    finally:
+        predictor.close()
+        if cache is not None:
+            cache.close()
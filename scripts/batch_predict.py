@@ -0,0 +1,67 @@
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from classes.prediction import Predictor
+from classes.submissions import open_submissions
+from config import PREDICTION_THRESHOLD, EXTRACTION_WORKERS, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, \
+    EXTRACTION_CPU_LIMIT, EXTRACTION_MAX_JOBS_PER_WORKER, FEATURE_CACHE_PATH
+from scripts.train_forest import open_feature_cache
+
+
+def write_jsonl(predictions, stream):
+    for prediction in predictions:
+        stream.write(json.dumps(prediction) + '\n')
+
+
+def write_csv(predictions, classes, stream):
+    writer = csv.writer(stream)
+    writer.writerow(['path', 'status', 'label', 'confidence'] + list(classes) + ['message'])
+    for prediction in predictions:
+        probabilities = prediction['probabilities'] or {}
+        writer.writerow([prediction['path'], prediction['status'], prediction['label'] or '',
+                         '' if prediction['confidence'] is None else prediction['confidence']]
+                        + [probabilities.get(label, '') for label in classes]
+                        + [prediction['message']])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Predict sorting algorithms of many submissions at once')
+    parser.add_argument('--input', help='Directory, glob pattern, zip or tar archive with source code')
+    parser.add_argument('--classifier', help='Path to trained classifier')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl', help='Output format')
+    parser.add_argument('--output', help='Path to output file. Standard output if not provided')
+    parser.add_argument('--workers', type=int, default=EXTRACTION_WORKERS,
+                        help='Number of parallel extraction processes')
+    parser.add_argument('--cache', default=FEATURE_CACHE_PATH, help='Path to feature cache directory')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='Extract characteristics without feature cache')
+    args = parser.parse_args()
+
+    cache = open_feature_cache(args.cache)
+    predictor = Predictor(args.classifier, PREDICTION_THRESHOLD, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, cache,
+                          args.workers, EXTRACTION_CPU_LIMIT, EXTRACTION_MAX_JOBS_PER_WORKER)
+    try:
+        with open_submissions(args.input) as (root, paths):
+            predictions = predictor.predict_batch(paths)
+            if root is not None:
+                # Report paths relative to given directory or unpacked archive
+                for prediction in predictions:
+                    prediction['path'] = str(Path(prediction['path']).relative_to(root))
+    finally:
+        predictor.close()
+        if cache is not None:
+            cache.close()
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            write_csv(predictions, [str(label) for label in predictor.model.classes_], output)
+        else:
+            write_jsonl(predictions, output)
+    finally:
+        if args.output:
+            output.close()
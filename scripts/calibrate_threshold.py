@@ -0,0 +1,165 @@
+import argparse
+import json
+import pickle
+from pathlib import Path
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+from classes.calibration import sweep_thresholds, reliability, class_reliability, recommend_threshold
+from classes.feature_dataset import FeatureDataset
+from classes.features import groups_of_columns
+from config import PREDICTION_THRESHOLD, EXTRACTION_WORKERS, EXTRACTION_TIMEOUT, FEATURE_CACHE_PATH, \
+    TRAINING_RANDOM_STATE, CALIBRATION_TARGET_ACCURACY, CALIBRATION_STEP, CALIBRATION_BINS
+from scripts.train_forest import collect_dataset, open_feature_cache
+
+
+def load_validation_set(classifier, label_encoder, features_path=None, dataset_path=None, workers=EXTRACTION_WORKERS,
+                        cache_path=FEATURE_CACHE_PATH):
+    """
+    @param classifier: trained RandomForestClassifier
+    @param label_encoder: LabelEncoder of classifier
+    @param features_path: saved FeatureDataset. Source code isn't run if given
+    @param dataset_path: dataset of sorting algorithms, used if features_path isn't given
+    @return: Tuple (dataframe of characteristics in model order, array of encoded labels)
+    """
+    columns = list(classifier.feature_names_in_)
+    if features_path is not None:
+        dataset = FeatureDataset.load(features_path)
+    else:
+        cache = open_feature_cache(cache_path)
+        try:
+            dataset = collect_dataset(Path(dataset_path), workers, EXTRACTION_TIMEOUT, cache=cache,
+                                      groups=groups_of_columns(columns))
+        finally:
+            if cache is not None:
+                cache.close()
+    frame = dataset.training_frame(columns, label_encoder.classes_)
+    return frame.drop(['sorting_algorithm'], axis=1), label_encoder.transform(frame['sorting_algorithm'])
+
+
+def predict_probabilities(classifier, features, targets, folds=None):
+    """
+    @param classifier: trained RandomForestClassifier
+    @param features: dataframe of characteristics
+    @param targets: array of encoded labels
+    @param folds: number of cross-validation folds. Trained classifier is applied to all samples if None,
+    otherwise every sample gets probabilities of a copy of classifier trained without it
+    @return: Tuple (matrix of probabilities, column indices of true classes)
+    """
+    if folds is None:
+        probabilities = classifier.predict_proba(features)
+    else:
+        splits = StratifiedKFold(folds, shuffle=True, random_state=TRAINING_RANDOM_STATE)
+        probabilities = cross_val_predict(clone(classifier), features, targets, cv=splits, method='predict_proba')
+    return probabilities, np.searchsorted(classifier.classes_, targets)
+
+
+def _to_list(values):
+    # NaN of empty bins and thresholds without accepted predictions isn't valid JSON
+    return [None if np.isnan(value) else value for value in np.asarray(values, dtype=np.float64).tolist()]
+
+
+def _reliability_dict(calibration):
+    return {'ece': calibration.ece, 'counts': calibration.counts.tolist(),
+            'confidence': _to_list(calibration.confidence), 'accuracy': _to_list(calibration.accuracy)}
+
+
+def calibration_report(probabilities, targets, class_names, target_accuracy=CALIBRATION_TARGET_ACCURACY,
+                       step=CALIBRATION_STEP, bins=CALIBRATION_BINS):
+    """
+    @param probabilities: matrix of class probabilities
+    @param targets: column indices of true classes
+    @param class_names: names of probability columns
+    @param target_accuracy: required accuracy of accepted predictions
+    @param step: step of threshold grid
+    @param bins: number of reliability bins
+    @return: Dictionary with threshold curves, overall and per-class calibration and recommended threshold
+    """
+    sweep = sweep_thresholds(probabilities, targets, np.arange(0, 1, step))
+    recommended = recommend_threshold(sweep, target_accuracy)
+    overall = reliability(probabilities.max(axis=1), probabilities.argmax(axis=1) == targets, bins)
+    current = sweep_thresholds(probabilities, targets, [PREDICTION_THRESHOLD])
+    return {
+        'samples': len(targets),
+        'curves': {field: _to_list(np.round(values, 6)) for field, values in sweep._asdict().items()},
+        'calibration': _reliability_dict(overall),
+        'classes': {str(name): _reliability_dict(class_calibration)
+                    for name, class_calibration in zip(class_names, class_reliability(probabilities, targets, bins))},
+        'current': {field: _to_list(values)[0] for field, values in current._asdict().items()},
+        'target_accuracy': target_accuracy,
+        'recommended': None if recommended is None else
+        {field: _to_list(values)[recommended] for field, values in sweep._asdict().items()},
+    }
+
+
+def _format(value, width, precision=3):
+    return f'{value:>{width}.{precision}f}' if value is not None else f"{'-':>{width}}"
+
+
+def print_report(report, every):
+    """
+    @param report: dictionary returned by calibration_report
+    @param every: only every n-th threshold of the grid is printed
+    """
+    curves = report['curves']
+    print(f"Samples: {report['samples']}")
+    print(f"{'threshold':>10}{'coverage':>10}{'accuracy':>10}{'unknown':>10}{'errors':>10}")
+    for i in range(0, len(curves['thresholds']), every):
+        print(''.join(_format(curves[field][i], 10) for field in
+                      ['thresholds', 'coverage', 'accuracy', 'unknown_rate', 'error_rate']))
+
+    print(f"Expected calibration error: {report['calibration']['ece']:.4f}")
+    print(f"{'confidence bin':>16}{'samples':>10}{'confidence':>12}{'accuracy':>10}")
+    bins = len(report['calibration']['counts'])
+    for i, (count, confidence, accuracy) in enumerate(zip(*(report['calibration'][key] for key in
+                                                            ['counts', 'confidence', 'accuracy']))):
+        bin_range = f'{i / bins:.2f}-{(i + 1) / bins:.2f}'
+        print(f"{bin_range:>16}{count:>10}{_format(confidence, 12)}{_format(accuracy, 10)}")
+    for name, class_calibration in report['classes'].items():
+        print(f"Expected calibration error of {name}: {class_calibration['ece']:.4f}")
+
+    current = report['current']
+    print(f"Current threshold {current['thresholds']:.3f}: coverage {current['coverage']:.3f}, "
+          f"accuracy {_format(current['accuracy'], 0)}")
+    recommended = report['recommended']
+    if recommended is None:
+        print(f"No threshold reaches accuracy {report['target_accuracy']}")
+    else:
+        print(f"Recommended threshold {recommended['thresholds']:.3f}: coverage {recommended['coverage']:.3f}, "
+              f"accuracy {recommended['accuracy']:.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Sweep prediction threshold and check calibration of classifier probabilities')
+    parser.add_argument('--classifier', help='Path to trained classifier')
+    parser.add_argument('--features-from', help='Feature dataset of validation implementations')
+    parser.add_argument('--dataset', help='Dataset of sorting algorithms, used if feature dataset is not given')
+    parser.add_argument('--workers', type=int, default=EXTRACTION_WORKERS,
+                        help='Number of parallel extraction processes')
+    parser.add_argument('--cache', default=FEATURE_CACHE_PATH, help='Path to feature cache directory')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='Extract characteristics without feature cache')
+    parser.add_argument('--cross-validate', type=int, metavar='FOLDS',
+                        help='Use out-of-fold probabilities, for validation data the classifier was trained on')
+    parser.add_argument('--target-accuracy', type=float, default=CALIBRATION_TARGET_ACCURACY,
+                        help='Required accuracy of accepted predictions')
+    parser.add_argument('--step', type=float, default=CALIBRATION_STEP, help='Step of threshold grid')
+    parser.add_argument('--bins', type=int, default=CALIBRATION_BINS, help='Number of reliability bins')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
+    args = parser.parse_args()
+
+    loaded_model = pickle.load(open(Path(args.classifier) / 'forest.clf', 'rb'))
+    label_encoder = pickle.load(open(Path(args.classifier) / 'label_encoder.pkl', 'rb'))
+
+    features, targets = load_validation_set(loaded_model, label_encoder, args.features_from, args.dataset,
+                                            args.workers, args.cache)
+    probabilities, class_indices = predict_probabilities(loaded_model, features, targets, args.cross_validate)
+    report = calibration_report(probabilities, class_indices, label_encoder.inverse_transform(loaded_model.classes_),
+                                args.target_accuracy, args.step, args.bins)
+    if args.format == 'json':
+        print(json.dumps(report))
+    else:
+        print_report(report, max(1, round(0.05 / args.step)))
@@ -0,0 +1,117 @@
+import argparse
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from classes.compact_forest import CompactForest
+from classes.feature_dataset import FeatureDataset
+from classes.pure_forest import PureForest
+
+
+def random_characteristics(feature_names, n_samples, seed):
+    """
+    Generates characteristics covering ranges seen in training. Used when no feature dataset is given
+    @return: Dataframe with feature_names columns
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name in feature_names:
+        if name.startswith('is_'):
+            columns[name] = rng.integers(0, 2, n_samples).astype(bool)
+        elif name.startswith('number_of'):
+            columns[name] = rng.integers(0, 15, n_samples)
+        else:
+            columns[name] = rng.integers(0, 12000, n_samples)
+    return pd.DataFrame(columns)
+
+
+def boundary_values(threshold):
+    """
+    Split threshold and its closest neighbours in double precision and after rounding to single precision,
+    which is how sklearn compares characteristics with thresholds
+    @return: List of values
+    """
+    single = np.float32(threshold)
+    return [threshold, np.nextafter(threshold, -np.inf), np.nextafter(threshold, np.inf),
+            float(single), float(np.nextafter(single, np.float32(-np.inf))),
+            float(np.nextafter(single, np.float32(np.inf)))]
+
+
+def boundary_characteristics(clf, base):
+    """
+    Moves one characteristic of real rows onto every split threshold of the forest and next to it
+    @param clf: fitted RandomForestClassifier
+    @param base: dataframe of characteristics in model order, rows are reused in turn
+    @return: Dataframe of float characteristics, one row per distinct (feature, boundary value) pair
+    """
+    pairs = set()
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        internal = tree.children_left != -1
+        for feature, threshold in zip(tree.feature[internal], tree.threshold[internal]):
+            pairs.update((int(feature), value) for value in boundary_values(float(threshold)))
+    pairs = sorted(pairs)
+
+    matrix = base.to_numpy(dtype=np.float64)[np.arange(len(pairs)) % len(base)]
+    features = np.array([feature for feature, _ in pairs], dtype=np.int64)
+    matrix[np.arange(len(pairs)), features] = [value for _, value in pairs]
+    return pd.DataFrame(matrix, columns=base.columns)
+
+
+def check_parity(classifier_path, characteristics):
+    """
+    @param classifier_path: directory of trained classifier
+    @param characteristics: dataframe of characteristics in model order
+    @return: Dictionary of (number of mismatching rows, maximal difference) by engine names.
+    Predictions of every engine are compared with forest.clf
+    """
+    clf = pickle.load(open(Path(classifier_path) / 'forest.clf', 'rb'))
+    label_encoder = pickle.load(open(Path(classifier_path) / 'label_encoder.pkl', 'rb'))
+    compact_forest = CompactForest.from_estimator(clf, label_encoder)
+    expected = clf.predict_proba(characteristics)
+
+    engines = {
+        'numpy': compact_forest.predict_proba,
+        'numpy (text)': CompactForest.loads(compact_forest.dumps()).predict_proba,
+        'pure python (text)': PureForest.loads(compact_forest.dumps()).predict_proba,
+    }
+    if (Path(classifier_path) / 'forest').exists():
+        engines['numpy (mmap)'] = CompactForest.load(Path(classifier_path) / 'forest').predict_proba
+        engines['pure python'] = PureForest.load(Path(classifier_path) / 'forest').predict_proba
+
+    results = {}
+    for name, predict_proba in engines.items():
+        actual = np.asarray(predict_proba(characteristics))
+        results[name] = (np.count_nonzero(np.any(actual != expected, axis=1)),
+                         float(np.max(np.abs(actual - expected), initial=0)))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Check that compact forest engines reproduce sklearn predictions exactly')
+    parser.add_argument('--classifier', help='Path to trained classifier')
+    parser.add_argument('--features-from', help='Feature dataset with real characteristics, e.g. training data')
+    parser.add_argument('--samples', type=int, default=10000,
+                        help='Number of random samples, used if feature dataset is not given')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    clf = pickle.load(open(Path(args.classifier) / 'forest.clf', 'rb'))
+    columns = list(clf.feature_names_in_)
+    if args.features_from is not None:
+        base = FeatureDataset.load(args.features_from).training_frame(columns).drop(['sorting_algorithm'], axis=1)
+    else:
+        base = random_characteristics(columns, args.samples, args.seed)
+    boundary = boundary_characteristics(clf, base)
+    characteristics = pd.concat([base.astype(np.float64), boundary], ignore_index=True)
+    print(f'{len(base)} base rows, {len(boundary)} rows on split boundaries')
+
+    failed = False
+    for name, (mismatches, difference) in check_parity(args.classifier, characteristics).items():
+        print(f'{name}: {mismatches} mismatches of {len(characteristics)}, max difference {difference}')
+        failed = failed or mismatches != 0
+    sys.exit(1 if failed else 0)
@@ -1,5 +1,4 @@
 import random
-import sys
 
 from matplotlib import pyplot as plt
 
@@ -12,8 +11,8 @@ from classes.performance_analysis import PerformanceAnalyser
 
 
 def plot_comparisons():
+    # Deep recursion on large data is handled by PerformanceAnalyser, which sorts on a thread with large stack
     N_LIMIT = 1000
-    sys.setrecursionlimit(1500)
     fig, axs = plt.subplots(3, 2)
     row = 0
     col = 0
@@ -0,0 +1,51 @@
+import argparse
+import json
+from pathlib import Path
+
+from classes.characteristics import get_profile_report
+from classes.extraction import ParallelExtractor
+from classes.submissions import open_submissions
+from config import EXTRACTION_WORKERS, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, EXTRACTION_CPU_LIMIT, \
+    EXTRACTION_MAX_JOBS_PER_WORKER
+from scripts.train_forest import report_failure
+
+
+def print_report(path, report, top):
+    """
+    @param path: path to source code
+    @param report: dictionary returned by PerformanceAnalyser.profile_report
+    @param top: number of most called functions shown for every test data
+    """
+    print(path)
+    print(f"{'data':<16}{'median time, us':>16}{'peak memory, B':>16}{'calls':>10}{'call depth':>12}")
+    for name, profile in report.items():
+        print(f"{name:<16}{profile['time'] / 1000:>16.1f}{profile['peak_memory']:>16}{profile['calls']:>10}"
+              f"{profile['max_depth']:>12}")
+    for name, profile in report.items():
+        functions = sorted(profile['calls_by_function'].items(), key=lambda item: -item[1])[:top]
+        print(f"Most called functions on {name} data: " +
+              ', '.join(f'{function} - {calls}' for function, calls in functions))
+    print("---------------------------------------------")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Profile running time, memory and function calls of sorting algorithms')
+    parser.add_argument('--input', help='Source file, directory, glob pattern, zip or tar archive with source code')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
+    parser.add_argument('--top', type=int, default=3, help='Number of most called functions shown in text report')
+    parser.add_argument('--workers', type=int, default=EXTRACTION_WORKERS,
+                        help='Number of parallel profiling processes')
+    args = parser.parse_args()
+
+    with open_submissions(args.input) as (root, paths), \
+            ParallelExtractor(get_profile_report, args.workers, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT,
+                              EXTRACTION_CPU_LIMIT, EXTRACTION_MAX_JOBS_PER_WORKER) as extractor:
+        for result in extractor.imap(paths):
+            path = Path(result.path).relative_to(root) if root is not None else result.path
+            if not result.ok:
+                report_failure(result)
+            elif args.format == 'json':
+                print(json.dumps({'path': str(path), 'profile': result.characteristics}))
+            else:
+                print_report(path, result.characteristics, args.top)
@@ -1,31 +1,25 @@
-import random
-
 import matplotlib.pyplot as plt
+import numpy as np
+
+from classes.distributions import generate
 
 
-def nearly_sorted(sorted_array, number_of_swaps=None):
+def nearly_sorted(sorted_array, max_displacement=None, seed=0):
     """
     Create nearly sorted array from sorted array
-    Performs random swaps between neighbours
+    Moves every element at most max_displacement positions away from its place
     @param sorted_array: Sorted array
-    @param number_of_swaps: Number of random swaps performed. Equals length of sorted array if not provided
+    @param max_displacement: Maximal distance of element from its sorted position. Tenth of length if not provided
+    @param seed: Seed of random generator
     @return: Nearly sorted array
     """
-
-    if number_of_swaps is None:
-        number_of_swaps = len(sorted_array)
-
-    copy = sorted_array.copy()
-    for i in range(number_of_swaps):
-        index = random.randint(0, len(copy) - 2)
-        copy[index], copy[index + 1] = copy[index + 1], copy[index]
-
-    return copy
+    permutation = generate('nearly sorted', len(sorted_array), seed, k=max_displacement)
+    return np.asarray(sorted_array)[permutation].tolist()
 
 
 if __name__ == '__main__':
     arr = [x for x in range(100)]
-    nearly_sorted = nearly_sorted(arr, len(arr))
+    nearly_sorted = nearly_sorted(arr)
     print(arr)
     print(nearly_sorted)
     plt.bar(range(len(arr)), arr, label='sorted')
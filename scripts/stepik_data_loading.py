@@ -1,62 +1,55 @@
+import argparse
+import os
 from pathlib import Path
 
-import requests
+from classes.stepik import StepikClient, SubmissionDownloader
+from config import STEPIK_BASE_URL, STEPIK_WORKERS, STEPIK_RATE, STEPIK_RETRIES
 
 
-def load_step_solutions(step_id, token, data_directory):
+def load_step_solutions(step_id, client, data_directory):
     """
     Loads Python code solutions from given Stepik step to directory
     :param step_id: step id
-    :param token: Stepik authentication token
+    :param client: StepikClient
     :param data_directory: path to directory where code solutions will be saved
-    :return:
+    :return: Number of saved solutions
     """
-
-    data_directory.mkdir(exist_ok=True)
-    has_next = True
-    step_directory = None
-    while has_next:
-        request_reply = requests.get('https://stepik.org/api/submissions',
-                                     headers={'Authorization': 'Bearer ' + token},
-                                     params={'step': step_id, 'status': 'correct'}
-                                     ).json()
-        has_next = request_reply['meta']['has_next']
-        submissions = request_reply['submissions']
-
-        for submission in submissions:
-            code = submission['reply'].get('code', None)
-            language = submission['reply'].get('language', None)
-            if code is not None and language == 'python3':
-                if not step_directory:
-                    step_directory = data_directory / str(step_id)
-                    step_directory.mkdir(exist_ok=True)
-                with open(step_directory / f'{submission["id"]}.py', 'w') as file:
-                    file.write(code)
+    return SubmissionDownloader(client, data_directory).load_step(step_id)
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description='Download correct Python solutions of Stepik steps')
+    parser.add_argument('steps', nargs='+', type=int, help='Ids of steps')
     # Get your keys at https://stepik.org/oauth2/applications/
     # (client type = confidential, authorization grant type = client credentials)
-    CLIENT_ID = "CLIENT_ID"
-    CLIENT_SECRET = "CLIENT_SECRET"
-
-    # Get a token
-    auth = requests.auth.HTTPBasicAuth(CLIENT_ID, CLIENT_SECRET)
-    response = requests.post('https://stepik.org/oauth2/token/',
-                             data={'grant_type': 'client_credentials'},
-                             auth=auth)
-    token = response.json().get('access_token', None)
-    if not token:
+    parser.add_argument('--client-id', default=os.environ.get('STEPIK_CLIENT_ID'),
+                        help='Client id of Stepik application, STEPIK_CLIENT_ID environment variable by default')
+    parser.add_argument('--client-secret', default=os.environ.get('STEPIK_CLIENT_SECRET'),
+                        help='Client secret of Stepik application, '
+                             'STEPIK_CLIENT_SECRET environment variable by default')
+    parser.add_argument('--output', default='./data', help='Path to saved data directory')
+    parser.add_argument('--workers', type=int, default=STEPIK_WORKERS, help='Number of steps loaded simultaneously')
+    parser.add_argument('--rate', type=float, default=STEPIK_RATE, help='Requests per second')
+    parser.add_argument('--retries', type=int, default=STEPIK_RETRIES, help='Retries of a failed request')
+    parser.add_argument('--restart', action='store_true',
+                        help='Load already loaded steps again from the first page to get new solutions')
+    parser.add_argument('--base-url', default=STEPIK_BASE_URL, help='Address of Stepik')
+    args = parser.parse_args()
+
+    if not args.client_id or not args.client_secret:
+        parser.error('Client id and client secret are required')
+
+    client = StepikClient(args.client_id, args.client_secret, args.base_url, args.rate, args.retries)
+    try:
+        client.token()
+    except PermissionError:
         print('Unable to authorize with provided credentials')
         exit(1)
 
-    # Step_id list
-    STEP_ID_LIST = []
-    # Path to saved data directory
-    PATH = Path('./data')
-
-    for step_id in STEP_ID_LIST:
-        load_step_solutions(step_id, token, PATH)
+    downloader = SubmissionDownloader(client, Path(args.output))
+    for step_id, saved in downloader.load(args.steps, args.workers, args.restart).items():
+        print(f'Step {step_id}: {saved} new solutions')
 
 
 if __name__ == '__main__':
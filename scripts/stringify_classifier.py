@@ -1,19 +1,31 @@
 import argparse
 import pickle
+import sys
 from pathlib import Path
 
+from classes.compact_forest import CompactForest
+from classes.features import FEATURE_COLUMNS
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
-        description='Convert classifier to txt')
+        description='Convert classifier to compact format and txt')
     parser.add_argument('--classifier', help='Path to trained classifier')
     args = parser.parse_args()
 
     loaded_model = pickle.load(open(Path(args.classifier) / 'forest.clf', 'rb'))
-    string = str(pickle.dumps(loaded_model, 0))
-    with open(Path(args.classifier) / 'forest.txt', "w") as text_file:
-        text_file.write(repr(string))
-
     loaded_encoder = pickle.load(open(Path(args.classifier) / 'label_encoder.pkl', 'rb'))
-    string = str(pickle.dumps(loaded_encoder, 0))
-    with open(Path(args.classifier) / 'label_encoder.txt', "w") as text_file:
-        text_file.write(repr(string))
+    forest = CompactForest.from_estimator(loaded_model, loaded_encoder)
+
+    # Memory-mappable arrays for prediction scripts
+    forest.save(Path(args.classifier) / 'forest')
+
+    # Single-file version computes only default characteristics
+    if list(forest.feature_names) != FEATURE_COLUMNS:
+        extra_columns = [name for name in forest.feature_names if name not in FEATURE_COLUMNS]
+        print(f'Classifier uses characteristics that moodle_file.py does not compute: {extra_columns}. '
+              'forest.txt is not written')
+        sys.exit(1)
+
+    # Base64 string for embedding into single-file version
+    with open(Path(args.classifier) / 'forest.txt', "w") as text_file:
+        text_file.write(forest.dumps())
@@ -1,56 +1,77 @@
 import argparse
 import pickle
-import traceback
 from pathlib import Path
 
 import numpy as np
 
-from classes.exceptions import IncorrectSorting, ErrorInSorting, NoSortMethod
-from config import PREDICTION_THRESHOLD
-from scripts.train_forest import get_algorithm_characteristics
+from classes.characteristics import make_extractor
+from classes.extraction import ParallelExtractor
+from classes.feature_cache import cache_namespace
+from classes.feature_dataset import FeatureDataset
+from classes.features import groups_of_columns, to_frame
+from config import PREDICTION_THRESHOLD, EXTRACTION_WORKERS, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, \
+    EXTRACTION_CPU_LIMIT, EXTRACTION_MAX_JOBS_PER_WORKER, FEATURE_CACHE_PATH
+from scripts.train_forest import open_feature_cache, report_failure
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
         description='Test threshold parameter for dataset and classifier')
     parser.add_argument('--dataset', help='Path to dataset of sorting algorithms')
     parser.add_argument('--classifier', help='Path to trained classifier')
+    parser.add_argument('--workers', type=int, default=EXTRACTION_WORKERS,
+                        help='Number of parallel extraction processes')
+    parser.add_argument('--cache', default=FEATURE_CACHE_PATH, help='Path to feature cache directory')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='Extract characteristics without feature cache')
+    parser.add_argument('--features-from',
+                        help='Use characteristics saved in feature dataset instead of running source code')
     args = parser.parse_args()
 
     loaded_model = pickle.load(open(Path(args.classifier) / 'forest.clf', 'rb'))
     label_encoder = pickle.load(open(Path(args.classifier) / 'label_encoder.pkl', 'rb'))
-    predictions = []
-    for path in Path(args.dataset).iterdir():
-        if path.is_dir() and path.name in label_encoder.classes_:
-            implementations = path.glob('*.py')
-
-            # Iterate over implementations
-            for implementation in implementations:
-                try:
-                    current_implementation_df = get_algorithm_characteristics(implementation)
-                except IncorrectSorting as e:
-                    # Handle incorrect algorithm
-                    print(f'Sorting algorithm from {implementation} is not correct')
-                    print(e)
-                    continue
-                except NoSortMethod:
-                    # Handle missing sort function
-                    print(f'Sorting algorithm from {implementation} is missing sort function')
-                    continue
-                except ErrorInSorting as e:
-                    # Handle error in provided source code
-                    print(f'Sorting algorithm  {implementation} raised an exception')
-                    print(e)
-                    traceback.print_exc()
-                    continue
-
-                prediction = loaded_model.predict_proba(current_implementation_df)
-                current_prediction = np.max(prediction[0])
-                if current_prediction < PREDICTION_THRESHOLD:
-                    print(implementation.name)
-                    print("Unknown algorithm")
-                    for i, val in enumerate(prediction[0]):
-                        print(f"{label_encoder.inverse_transform([i])[0]} - {round(val * 100, 4)}%")
-                    print("---------------------------------------------")
-                predictions.append(current_prediction)
+
+    columns = list(loaded_model.feature_names_in_)
+    groups = groups_of_columns(columns)
+
+    if args.features_from is not None:
+        dataset = FeatureDataset.load(args.features_from)
+        names = [Path(path).name for path in dataset.columns['path'][dataset.extracted(label_encoder.classes_)]]
+        features = dataset.training_frame(columns, label_encoder.classes_).drop(['sorting_algorithm'], axis=1)
+    else:
+        implementations = []
+        for path in Path(args.dataset).iterdir():
+            if path.is_dir() and path.name in label_encoder.classes_:
+                implementations.extend(path.glob('*.py'))
+
+        cache = open_feature_cache(args.cache)
+        extracted = []
+        try:
+            with ParallelExtractor(make_extractor(groups), args.workers, EXTRACTION_TIMEOUT,
+                                   EXTRACTION_MEMORY_LIMIT, EXTRACTION_CPU_LIMIT,
+                                   EXTRACTION_MAX_JOBS_PER_WORKER) as extractor:
+                for result in extractor.imap(implementations, cache, cache_namespace(groups)):
+                    if not result.ok:
+                        report_failure(result)
+                        continue
+                    extracted.append(result)
+        finally:
+            if cache is not None:
+                cache.close()
+        names = [result.path.name for result in extracted]
+        features = to_frame([result.characteristics for result in extracted], columns)
+
+    if len(features):
+        probabilities = loaded_model.predict_proba(features)
+        predictions = np.max(probabilities, axis=1)
+    else:
+        # Classifier can't predict an empty frame, average of no predictions is printed as before
+        probabilities, predictions = [], np.empty(0)
+    for name, prediction, current_prediction in zip(names, probabilities, predictions):
+        if current_prediction < PREDICTION_THRESHOLD:
+            print(name)
+            print("Unknown algorithm")
+            for i, val in enumerate(prediction):
+                print(f"{label_encoder.inverse_transform([i])[0]} - {round(val * 100, 4)}%")
+            print("---------------------------------------------")
 
     print(f"Average percentage: {round(np.average(predictions) * 100, 4)}%")
@@ -1,88 +1,244 @@
 import argparse
 import pickle
 import shutil
-import traceback
 from pathlib import Path
 
-import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.experimental import enable_halving_search_cv  # noqa
-from sklearn.model_selection import cross_val_score, RepeatedKFold, HalvingGridSearchCV
 
-from classes.exceptions import ErrorInSorting, NoSortMethod, IncorrectSorting
-from classes.performance_analysis import PerformanceAnalyser
-from classes.syntax_analysis import SyntaxAnalyser
+from classes.characteristics import make_extractor
+from classes.compact_forest import CompactForest
+from classes.extraction import ParallelExtractor
+from classes.feature_cache import FeatureCache, cache_namespace, extractor_version
+from classes.feature_dataset import FeatureDataset
+from classes.features import FEATURE_GROUPS, feature_columns
+from classes.training import CheckpointStore, dataset_fingerprint, search, validate
+from classes.training_state import TrainingState
+from config import EXTRACTION_WORKERS, EXTRACTION_TIMEOUT, EXTRACTION_MEMORY_LIMIT, EXTRACTION_CPU_LIMIT, \
+    EXTRACTION_MAX_JOBS_PER_WORKER, FEATURE_CACHE_PATH, FEATURE_CACHE_MAX_BYTES, TRAINING_FEATURE_GROUPS, \
+    TRAINING_SEARCH_SPACE, TRAINING_TIME_BUDGET, TRAINING_JOBS, TRAINING_RANDOM_STATE, TRAINING_CHECKPOINT_PATH, \
+    TRAINING_EXTRA_TREES
 
 
-def get_algorithm_characteristics(path_to_algorithm: Path):
+def report_failure(result):
     """
-    Extracts performance and syntax characteristics of given sorting algorithm
-    @param path_to_algorithm: path to source code of sorting algorithm
-    @return: Dataframe containing algorithm characteristics
+    Prints reason why characteristics of sorting algorithm weren't extracted
+    @param result: failed ExtractionResult
     """
-    try:
-        module = __import__(f'{".".join(path_to_algorithm.parts[:-1])}.{path_to_algorithm.stem}',
-                            fromlist=['sort'])
-    except AttributeError:
-        raise NoSortMethod(Path)
+    if result.status == 'incorrect':
+        # Handle incorrect algorithm
+        print(f'Sorting algorithm from {result.path} is not correct')
+    elif result.status == 'no_sort':
+        # Handle missing sort function
+        print(f'Sorting algorithm from {result.path} is missing sort function')
+    elif result.status == 'too_slow':
+        print(f'Sorting algorithm from {result.path} exceeded comparison budget')
+    elif result.status == 'timeout':
+        print(f'Sorting algorithm from {result.path} exceeded time limit')
+    elif result.status == 'memory':
+        print(f'Sorting algorithm from {result.path} exceeded memory limit')
+    elif result.status == 'cpu_limit':
+        print(f'Sorting algorithm from {result.path} exceeded CPU time limit')
+    elif result.status == 'crashed':
+        print(f'Sorting algorithm from {result.path} crashed worker process')
+    else:
+        # Handle error in provided source code
+        print(f'Sorting algorithm  {result.path} raised an exception')
+    print(result.message)
+
 
-    performance_characteristics = PerformanceAnalyser.measure_algorithm(getattr(module, 'sort'))
+def open_feature_cache(path):
+    """
+    @param path: path to feature cache directory. Caching is disabled if None
+    @return: FeatureCache or None
+    """
+    if path is None:
+        return None
+    return FeatureCache(path, FEATURE_CACHE_MAX_BYTES)
 
-    # Syntax
-    with open(path_to_algorithm) as in_stream:
-        code = in_stream.read()
-        syntax_characteristics = SyntaxAnalyser.analyze(code)
 
-        all_characteristics = performance_characteristics.join(syntax_characteristics)
+def find_implementations(path_to_data):
+    """
+    @param path_to_data: path to dataset. Every subdirectory contains implementations of one sorting algorithm
+    @return: Dictionary of sorting algorithm names by paths to implementations
+    """
+    # Collect implementations from different directories for different sorting algorithms
+    labels = {}
+    for path in path_to_data.iterdir():
+        if path.is_dir():
+            for implementation in path.glob('*.py'):
+                labels[implementation] = path.name
+    return labels
 
-    return all_characteristics
 
+def extract(paths, workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT, memory_limit=EXTRACTION_MEMORY_LIMIT,
+            cache=None, cpu_limit=EXTRACTION_CPU_LIMIT, groups=()):
+    """
+    Extracts characteristics of given implementations, failures are reported
+    @return: Generator of ExtractionResult
+    """
+    with ParallelExtractor(make_extractor(groups), workers, timeout, memory_limit, cpu_limit,
+                           EXTRACTION_MAX_JOBS_PER_WORKER) as extractor:
+        for result in extractor.imap(paths, cache, cache_namespace(groups)):
+            if not result.ok:
+                report_failure(result)
+            yield result
 
-def collect_data(path_to_data):
-    sorting_df = pd.DataFrame()
 
-    # Iterate over different directories for different sorting algorithms
-    for path in path_to_data.iterdir():
-        if path.is_dir():
-            current_algorithm_df = pd.DataFrame()
-            implementations = path.glob('*.py')
-
-            # Iterate over implementations
-            for implementation in implementations:
-                try:
-                    current_implementation_df = get_algorithm_characteristics(implementation)
-                except IncorrectSorting as e:
-                    # Handle incorrect algorithm
-                    print(f'Sorting algorithm from {implementation} is not correct')
-                    print(e)
-                    continue
-                except NoSortMethod:
-                    # Handle missing sort function
-                    print(f'Sorting algorithm from {implementation} is missing sort function')
-                    continue
-                except ErrorInSorting as e:
-                    # Handle error in provided source code
-                    print(f'Sorting algorithm  {implementation} raised an exception')
-                    print(e)
-                    traceback.print_exc()
-                    continue
-
-                current_algorithm_df = pd.concat([current_algorithm_df, current_implementation_df])
-
-            if not current_algorithm_df.empty:
-                current_algorithm_df = current_algorithm_df.assign(sorting_algorithm=path.name)
-                current_algorithm_df['is_stable'] = current_algorithm_df['is_stable'].astype(bool)
-                current_algorithm_df['is_recursive'] = current_algorithm_df['is_recursive'].astype(bool)
-                sorting_df = pd.concat([sorting_df, current_algorithm_df])
-
-    return sorting_df
-
-
-def train_classifier(dataset_path, output_path):
+def collect_dataset(path_to_data, workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT,
+                    memory_limit=EXTRACTION_MEMORY_LIMIT, cache=None, cpu_limit=EXTRACTION_CPU_LIMIT, groups=()):
+    """
+    Extracts characteristics of all sorting algorithms in dataset
+    @param path_to_data: path to dataset. Every subdirectory contains implementations of one sorting algorithm
+    @param workers: number of parallel worker processes
+    @param timeout: time limit for a single implementation in seconds
+    @param memory_limit: memory limit for a single implementation in bytes
+    @param cache: FeatureCache for reusing characteristics of unchanged implementations
+    @param cpu_limit: CPU time limit for a single implementation in seconds
+    @param groups: names of optional feature groups to extract in addition to default characteristics
+    @return: FeatureDataset with rows of all implementations, failed ones included
+    """
+    labels = find_implementations(path_to_data)
+    results = {result.path: result
+               for result in extract(labels, workers, timeout, memory_limit, cache, cpu_limit, groups)}
+    return FeatureDataset.from_results([results[path] for path in labels], labels, path_to_data,
+                                       extractor_version(), groups)
+
+
+def collect_data(path_to_data, workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT,
+                 memory_limit=EXTRACTION_MEMORY_LIMIT, cache=None, cpu_limit=EXTRACTION_CPU_LIMIT, groups=()):
+    """
+    Extracts characteristics of all sorting algorithms in dataset, parameters are the same as of collect_dataset
+    @return: Dataframe containing characteristics and sorting_algorithm column
+    """
+    dataset = collect_dataset(path_to_data, workers, timeout, memory_limit, cache, cpu_limit, groups)
+    return dataset.training_frame(feature_columns(groups))
+
+
+def load_features(features_path, groups=()):
+    """
+    Reads characteristics from saved FeatureDataset without running any source code
+    @param features_path: dataset directory
+    @param groups: names of optional feature groups used in addition to default characteristics
+    @return: Dataframe containing characteristics and sorting_algorithm column
+    """
+    dataset = FeatureDataset.load(features_path)
+    if set(dataset.columns['version'].tolist()) - {extractor_version()}:
+        print(f'Characteristics in {features_path} were extracted by another version of extractor')
+    return dataset.training_frame(feature_columns(groups))
+
+
+def collect_incremental(path_to_data, state, workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT,
+                        memory_limit=EXTRACTION_MEMORY_LIMIT, cache=None, cpu_limit=EXTRACTION_CPU_LIMIT, groups=()):
+    """
+    Extracts characteristics only of implementations that are new or changed since the state was saved,
+    removed implementations are dropped from the state
+    @param state: TrainingState of previous training
+    @return: Dataframe containing characteristics and sorting_algorithm column
+    """
+    labels = find_implementations(path_to_data)
+    hashes, changed = state.plan(labels, path_to_data)
+    print(f'{len(changed)} of {len(labels)} implementations are new or changed')
+    results = list(extract(changed, workers, timeout, memory_limit, cache, cpu_limit, groups))
+    state.update(labels, path_to_data, hashes, results)
+    state.save()
+    return state.dataset.training_frame(feature_columns(groups))
+
+
+def fit_classifier(features, targets, jobs=TRAINING_JOBS, budget=TRAINING_TIME_BUDGET,
+                   checkpoint_path=TRAINING_CHECKPOINT_PATH):
+    """
+    Chooses parameters of random forest with checkpointed parallel search, validates and fits it
+    @param features: dataframe of characteristics
+    @param targets: array of encoded labels
+    @param jobs: number of parallel fits, all CPUs if -1
+    @param budget: wall-clock budget of parameter search in seconds
+    @param checkpoint_path: directory of per-fold results. Checkpointing is disabled if None
+    @return: Fitted RandomForestClassifier
+    """
+    store = CheckpointStore(checkpoint_path, dataset_fingerprint(features, targets))
+    params, evaluated = search(features, targets, TRAINING_SEARCH_SPACE, store, jobs, budget, TRAINING_RANDOM_STATE)
+    print(f'Evaluated {len(evaluated)} parameter sets, best: {params}')
+
+    # Validation
+    scores = validate(params, features, targets, store, jobs, TRAINING_RANDOM_STATE)
+    print(scores.mean())
+
+    clf = RandomForestClassifier(**params, random_state=TRAINING_RANDOM_STATE, n_jobs=jobs).fit(features, targets)
+    # Fitted forest is used by one process at a time
+    clf.n_jobs = None
+    store.remove()
+    print(clf)
+    return clf
+
+
+def grow_classifier(classifier_path, features, targets, label_encoder, extra_trees=TRAINING_EXTRA_TREES,
+                    jobs=TRAINING_JOBS):
+    """
+    Adds trees fitted on current dataset to previously trained forest
+    @param classifier_path: directory of previously saved classifier
+    @param features: dataframe of characteristics
+    @param targets: array of encoded labels
+    @param label_encoder: fitted LabelEncoder of targets
+    @param extra_trees: number of added trees
+    @param jobs: number of parallel fits, all CPUs if -1
+    @return: Fitted RandomForestClassifier or None if previous forest has different classes or characteristics
+    """
+    try:
+        clf = pickle.load(open(Path(classifier_path) / "forest.clf", 'rb'))
+        previous_encoder = pickle.load(open(Path(classifier_path) / "label_encoder.pkl", 'rb'))
+    except OSError:
+        return None
+    if list(previous_encoder.classes_) != list(label_encoder.classes_) or \
+            list(clf.feature_names_in_) != list(features.columns):
+        return None
+
+    clf.set_params(warm_start=True, n_estimators=clf.n_estimators + extra_trees, n_jobs=jobs)
+    clf.fit(features, targets)
+    clf.set_params(warm_start=False, n_jobs=None)
+    print(f'Forest grown to {clf.n_estimators} trees')
+    return clf
+
+
+def save_classifier(clf, label_encoder, output_path):
+    """
+    @param clf: fitted RandomForestClassifier
+    @param label_encoder: fitted LabelEncoder
+    @param output_path: classifier directory. Replaced if exists
+    """
+    output_path = Path(output_path)
+    if output_path.exists():
+        shutil.rmtree(output_path)
+    output_path.mkdir(exist_ok=False)
+
+    pickle.dump(clf, open(output_path / "forest.clf", 'wb'))
+    pickle.dump(label_encoder, open(output_path / "label_encoder.pkl", 'wb'))
+    CompactForest.from_estimator(clf, label_encoder).save(output_path / "forest")
+
+
+def train_classifier(dataset_path, output_path, workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT,
+                     cache_path=FEATURE_CACHE_PATH, groups=TRAINING_FEATURE_GROUPS, jobs=TRAINING_JOBS,
+                     budget=TRAINING_TIME_BUDGET, checkpoint_path=TRAINING_CHECKPOINT_PATH, incremental=False,
+                     extra_trees=None, features_path=None, save_features_path=None,
+                     memory_limit=EXTRACTION_MEMORY_LIMIT):
     # Collect data from implementations dataset
-    path_to_data = Path(dataset_path)
-    sorting_df = collect_data(path_to_data)
+    path_to_data = Path(dataset_path) if dataset_path is not None else None
+    cache = open_feature_cache(cache_path) if features_path is None else None
+    try:
+        if features_path is not None:
+            sorting_df = load_features(features_path, groups)
+        elif incremental:
+            state = TrainingState(Path(output_path) / "training_state", extractor_version(), groups)
+            sorting_df = collect_incremental(path_to_data, state, workers, timeout, memory_limit, cache,
+                                             groups=groups)
+        else:
+            dataset = collect_dataset(path_to_data, workers, timeout, memory_limit, cache, groups=groups)
+            if save_features_path is not None:
+                dataset.save(save_features_path)
+            sorting_df = dataset.training_frame(feature_columns(groups))
+    finally:
+        if cache is not None:
+            cache.close()
 
     if len(sorting_df) != 0:
         algorithms = list(sorting_df['sorting_algorithm'].unique())
@@ -90,17 +246,15 @@ def train_classifier(dataset_path, output_path):
         targets = label_encoder.transform(sorting_df['sorting_algorithm'])
         test = sorting_df.drop(['sorting_algorithm'], axis=1)
 
-        param_grid = {'max_depth': [3, 4, 5, 7, 9]}
-        base_estimator = RandomForestClassifier()
-        sh = HalvingGridSearchCV(base_estimator, param_grid, cv=5,
-                                 factor=2, resource='n_estimators',
-                                 max_resources=100).fit(test, targets)
-        clf = sh.best_estimator_
-        print(clf)
-
-        # Validation
-        scores = cross_val_score(clf, test, targets, cv=RepeatedKFold(n_splits=10, n_repeats=20))
-        print(scores.mean())
+        classifier_path = Path(output_path) / "classifier"
+        clf = None
+        if extra_trees:
+            clf = grow_classifier(classifier_path, test, targets, label_encoder, extra_trees, jobs)
+            if clf is None:
+                print('Previous classifier is missing or was trained on different classes or characteristics, '
+                      'training from scratch')
+        if clf is None:
+            clf = fit_classifier(test, targets, jobs, budget, checkpoint_path)
 
         # Plot classifier
         # clf = clf.fit(test, targets)
@@ -109,13 +263,7 @@ def train_classifier(dataset_path, output_path):
         #     _ = plot_tree(tree, filled=True, feature_names=test.columns, class_names=algorithms)
         #     plt.show()
 
-        output_path = Path(output_path) / "classifier"
-        if output_path.exists():
-            shutil.rmtree(output_path)
-        output_path.mkdir(exist_ok=False)
-
-        pickle.dump(clf, open(Path(output_path) / "forest.clf", 'wb'))
-        pickle.dump(label_encoder, open(Path(output_path) / "label_encoder.pkl", 'wb'))
+        save_classifier(clf, label_encoder, classifier_path)
 
 
 if __name__ == '__main__':
@@ -123,5 +271,32 @@ if __name__ == '__main__':
         description='Train random forest classifier')
     parser.add_argument('--dataset', help='Path to dataset of sorting algorithms')
     parser.add_argument('--output', help='Path for saving trained classifier')
+    parser.add_argument('--workers', type=int, default=EXTRACTION_WORKERS,
+                        help='Number of parallel extraction processes')
+    parser.add_argument('--timeout', type=float, default=EXTRACTION_TIMEOUT,
+                        help='Time limit for a single implementation in seconds')
+    parser.add_argument('--memory-limit', type=int, default=EXTRACTION_MEMORY_LIMIT,
+                        help='Address space limit of a worker process in bytes')
+    parser.add_argument('--cache', default=FEATURE_CACHE_PATH, help='Path to feature cache directory')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='Extract characteristics without feature cache')
+    parser.add_argument('--features', nargs='*', choices=list(FEATURE_GROUPS), default=TRAINING_FEATURE_GROUPS,
+                        help='Optional feature groups used in addition to default characteristics')
+    parser.add_argument('--jobs', type=int, default=TRAINING_JOBS, help='Number of parallel fits, all CPUs if -1')
+    parser.add_argument('--budget', type=float, default=TRAINING_TIME_BUDGET,
+                        help='Wall-clock budget of parameter search in seconds')
+    parser.add_argument('--checkpoints', default=TRAINING_CHECKPOINT_PATH,
+                        help='Directory of per-fold results for resuming interrupted training')
+    parser.add_argument('--no-checkpoints', dest='checkpoints', action='store_const', const=None,
+                        help='Train without checkpoints')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Extract characteristics only of implementations added or changed since previous training')
+    parser.add_argument('--extra-trees', type=int, nargs='?', const=TRAINING_EXTRA_TREES, default=None,
+                        help='Add trees to previously trained forest instead of training it from scratch')
+    parser.add_argument('--features-from',
+                        help='Train on characteristics saved in feature dataset instead of running source code')
+    parser.add_argument('--save-features', help='Path for saving extracted characteristics as feature dataset')
     args = parser.parse_args()
-    train_classifier(args.dataset, args.output)
+    train_classifier(args.dataset, args.output, args.workers, args.timeout, args.cache, tuple(args.features),
+                     args.jobs, args.budget, args.checkpoints, args.incremental, args.extra_trees,
+                     args.features_from, args.save_features, args.memory_limit)